@@ -1,10 +1,3 @@
-import subprocess
-import pprint
-import requests
-import base64
-import json
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 """
 Handles classes and methods for an active local LOL Client.
 
@@ -17,25 +10,426 @@ Classes:
 Errors:
 --------------------
     `ClientConnectionError` - Error occurs when the program is unable to make a connection to the local client.
+
+Heavy dependencies (requests, asyncio, subprocess) are imported the first time they are
+needed, so importing this module is cheap and has no side effects.
+
+Priorities:
+--------------------
+    `CRITICAL` - Never rate limited, used for champion lock ins.
+
+    `INTERACTIVE` - Default for requests made on behalf of the user.
+
+    `BACKGROUND` - Rune page syncs, polling and other bulk work, sent last.
+
+Both clients share one request layer: the endpoint logic is written once in `_ClientBase`
+as generators that yield `_Request`s and receive the responses, `Client` sends them
+blocking and `Async_Client` sends them without blocking the event loop. Both send through
+a `_Transport`, which owns the pooled session, the base url and the request metrics, and
+a `_Scheduler`, which rate limits requests and sends waiting ones in priority order.
+Identical GETs that are in flight at the same time, from several threads of a `Client` or
+several coroutines of an `Async_Client`, are sent only once and share the decoded result,
+so the dicts and lists returned by the read methods should be treated as read only.
 """
+
+import json
+import time
+import heapq
+import itertools
+import threading
+from collections import namedtuple
+import gamedata
+import _local_http
+import tracing
+
 class ClientConnectionError(Exception):
     def __init__(self, msg):
         self.msg = msg
 
-class Client():
+CRITICAL = 0
+INTERACTIVE = 1
+BACKGROUND = 2
+
+_Request = namedtuple('_Request', ['method', 'endpoint', 'data', 'priority'], defaults = [None, INTERACTIVE])
+
+
+class _Scheduler():
+    """
+    Rate limits LCU requests with a token bucket and admits waiting requests by priority.
+
+    A request waits until it is the most important one waiting and a token is available.
+    `CRITICAL` requests are admitted at once, their tokens are borrowed from later requests.
+
+    Attributes:
+    ----------
+    `rate` : float
+        Tokens added per second, None to disable rate limiting.
+    `burst` : int
+        Size of the bucket, the number of requests that can be sent at once after idling.
+    """
+    def __init__(self, rate : float = 10.0, burst : int = 10):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._waiting = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    def _enqueue(self, priority : int):
+        ticket = (priority, next(self._order))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _try_admit(self, ticket):
+        """
+        Admits `ticket` if it may be sent now, must be called with the condition held.
+
+        Returns 0 when admitted, otherwise the seconds until it should try again, or None
+        to wait until another request was admitted.
+        """
+        if self.rate is not None:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if ticket[0] != CRITICAL:
+                if self._waiting[0] != ticket:
+                    return None
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        self._abandon(ticket)
+        return 0
+
+    def refund(self):
+        """Gives back the token of an admitted request that was not sent."""
+        if self.rate is None:
+            return
+        with self._cond:
+            self._tokens = min(self.burst, self._tokens + 1)
+            self._cond.notify_all()
+
+    def _abandon(self, ticket):
+        """Removes `ticket` from the waiting requests, must be called with the condition held."""
+        self._waiting.remove(ticket)
+        heapq.heapify(self._waiting)
+        self._cond.notify_all()
+
+    def acquire(self, priority : int = INTERACTIVE):
+        """Blocks until a request of `priority` may be sent."""
+        ticket = self._enqueue(priority)
+        with self._cond:
+            try:
+                while True:
+                    delay = self._try_admit(ticket)
+                    if delay == 0:
+                        return
+                    self._cond.wait(delay)
+            except BaseException:
+                #an interrupted wait must not stay at the head of the queue, blocking every later request
+                if ticket in self._waiting:
+                    self._abandon(ticket)
+                raise
+
+    async def acquire_async(self, priority : int = INTERACTIVE):
+        """Waits without blocking the event loop until a request of `priority` may be sent."""
+        import asyncio
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_admit(ticket)
+                if delay == 0:
+                    return
+                await asyncio.sleep(0.005 if delay is None else delay)
+        except BaseException:
+            with self._cond:
+                if ticket in self._waiting:
+                    self._abandon(ticket)
+            raise
+
+
+_decode_lock = threading.Lock()
+
+def _decode(resp):
+    """
+    Returns the decoded json of a Response, decoding it only once.
+
+    Callers that shared a coalesced GET get the same object back, so it must be treated as read only.
+    """
+    with _decode_lock:
+        try:
+            return resp._decoded
+        except AttributeError:
+            resp._decoded = resp.json()
+            return resp._decoded
+
+
+class _Flight():
+    """A GET that is in flight, shared by every caller that asks for the same endpoint meanwhile."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class _Transport():
+    """
+    Sends requests to the LCU, shared by `Client` and `Async_Client`.
+
+    Attributes:
+    ----------
+    `session` : Session
+        A requests.Session() object loaded with the login info for the LCU, its connections are pooled.
+    `app_port` : str
+        The port of the LCU.
+    `base_url` : str
+        `https://127.0.0.1:<app_port>`, built once.
+    `metrics` : dict
+        Maps (method, endpoint) to [number of requests, total seconds spent].
+    `coalesced` : int
+        Number of GETs answered by a request that was already in flight.
+    `scheduler` : _Scheduler
+        Rate limits and orders the requests.
+    """
+    def __init__(self, session, app_port : str, scheduler : _Scheduler = None):
+        self.session = session
+        self.app_port = app_port
+        self.base_url = f'https://127.0.0.1:{app_port}'
+        self.metrics = {}
+        self.coalesced = 0
+        self.scheduler = scheduler if scheduler is not None else _Scheduler()
+        self._flights = {}
+        self._async_flights = {}
+        self._flights_lock = threading.Lock()
+
+    def _join(self, flights : dict, key, new_flight):
+        """
+        Joins the flight of `key`, or registers `new_flight()` as a new one when `new_flight` is given.
+
+        Returns a tuple of the flight, None if there was none to join, and whether the caller leads it.
+        """
+        with self._flights_lock:
+            flight = flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            if new_flight is None:
+                return None, False
+            flight = flights[key] = new_flight()
+            return flight, True
+
+    def send(self, method : str, endpoint : str, data = None, priority : int = INTERACTIVE):
+        """
+        Sends one request to the LCU, blocking until the scheduler admits it, and returns the Response.
+
+        A GET joins an identical GET that is already in flight. Flights are only shared once
+        they were admitted, so a caller never waits in the scheduler behind a less important one.
+        """
+        if method != 'GET':
+            self.scheduler.acquire(priority)
+            return self._request(method, endpoint, data)
+        flight, leader = self._join(self._flights, endpoint, None)
+        if flight is None:
+            self.scheduler.acquire(priority)
+            flight, leader = self._join(self._flights, endpoint, _Flight)
+            if not leader:
+                #another caller was admitted for the same GET meanwhile
+                self.scheduler.refund()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+        try:
+            flight.response = self._request(method, endpoint)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[endpoint]
+            flight.done.set()
+        return flight.response
+
+    async def send_async(self, method : str, endpoint : str, data = None, priority : int = INTERACTIVE):
+        """Sends one request to the LCU from a worker thread, waiting for the scheduler without blocking the event loop."""
+        import asyncio
+        if method != 'GET':
+            await self.scheduler.acquire_async(priority)
+            return await asyncio.to_thread(self._request, method, endpoint, data)
+        loop = asyncio.get_running_loop()
+        key = (loop, endpoint)
+        flight, leader = self._join(self._async_flights, key, None)
+        if flight is None:
+            await self.scheduler.acquire_async(priority)
+            flight, leader = self._join(self._async_flights, key,
+                                        lambda: loop.create_task(asyncio.to_thread(self._request, method, endpoint)))
+            if leader:
+                flight.add_done_callback(lambda done: self._land(key, done))
+            else:
+                self.scheduler.refund()
+        #the request runs in its own task, a caller that is cancelled stops waiting without cancelling it for the others
+        return await asyncio.shield(flight)
+
+    def _land(self, key, flight):
+        """Removes a finished async flight, marking its outcome as retrieved so a failure nobody waited for is not logged."""
+        with self._flights_lock:
+            del self._async_flights[key]
+        flight.cancelled() or flight.exception()
+
+    def _request(self, method : str, endpoint : str, data = None):
+        """Sends one request to the LCU right away and returns the Response."""
+        start = time.perf_counter()
+        try:
+            with tracing.span('lcu_request', 'lcu', method = method, endpoint = endpoint):
+                return self.session.request(method, self.base_url + endpoint, data = data, verify = False)
+        finally:
+            entry = self.metrics.get((method, endpoint))
+            if entry is None:
+                entry = self.metrics[(method, endpoint)] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+
+def _login(scheduler : _Scheduler = None):
+    """
+    Finds the port and auth token of the running LCU and returns a `_Transport` logged into it.
+
+    """
+    import subprocess, base64
+    auth = subprocess.run(args = ['wmic', 'PROCESS', 'WHERE', "name='LeagueClientUx.exe'", 'GET', 'commandline'],capture_output=True)
+
+    #finding app port
+    index = str(auth).find('--app-port=')
+    app_port = (str(auth))[index+len('--app-port='):index+len('--app-port=') + 5]
+
+    #finding auth token
+    index = str(auth).find('--remoting-auth-token=')
+    auth_token = str(auth)[index+len('--remoting-auth-token='):index+len('--remoting-auth-token=')+len('_3qGJj4eNN8NKLBDpuBrqg')]
+
+    #creating and encoding login
+    login = f'riot:{auth_token}'
+    encodeLogin = 'Basic ' + (base64.b64encode(login.encode('ascii'))).decode('ascii')
+
+    #creating session with login info
+    sess = _local_http.new_session()
+    headers = {'Authorization' : encodeLogin,
+                'User-Agent': 'insomnia/7.1.1',
+                'Accept': '*/*'}
+    sess.headers.update(headers)
+    return _Transport(sess, app_port, scheduler)
+
+
+def _drive(steps, send):
+    """Runs an endpoint generator to completion, sending every request it yields with `send`."""
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(send(*request))
+    except StopIteration as done:
+        return done.value
+
+
+class _ClientBase():
+    """
+    Endpoint logic shared by `Client` and `Async_Client`.
+
+    Every endpoint is a generator that yields the `_Request`s it needs, receives their
+    Responses and returns the result, so it is written once and driven by either facade.
+    """
+    def __init__(self, rate_limit : float = 10.0, burst : int = 10, transport : _Transport = None):
+        """Logs into the LCU, or uses `transport` if one is given, and loads the current summoner."""
+        self._transport = transport if transport is not None else _login(_Scheduler(rate_limit, burst))
+        self.session = self._transport.session
+        self.app_port = self._transport.app_port
+        self.summoner_id = 0
+        try:
+            connected = _drive(self._check_connection(CRITICAL), self._transport.send)
+        except Exception:
+            connected = False
+        if connected == False:
+            raise ClientConnectionError('Unable to establish connection to League Client.')
+
+    @property
+    def metrics(self):
+        """Maps (method, endpoint) to [number of requests, total seconds spent]."""
+        return self._transport.metrics
+
+    def _check_connection(self, priority : int = INTERACTIVE):
+        resp = yield _Request('GET', '/lol-summoner/v1/current-summoner', priority = priority)
+        if resp.ok:
+            self.summoner_id = _decode(resp)['summonerId']
+        return resp.ok
+
+    def _get_json(self, endpoint : str, priority : int = INTERACTIVE):
+        resp = yield _Request('GET', endpoint, priority = priority)
+        return _decode(resp)
+
+    def _change_current_page(self, name, primary_tree, perks : list, secondary_tree):
+        #the decoded page may be shared with other readers, so it is copied before being changed
+        data = dict((yield from self._get_json('/lol-perks/v1/currentpage', BACKGROUND)))
+        page_id = data['id']
+        data["name"] = name
+        data["selectedPerkIds"] = [gamedata.resolve('runes', perk) for perk in perks]
+        data["primaryStyleId"] = gamedata.resolve('runes', primary_tree)
+        data["subStyleId"] = gamedata.resolve('runes', secondary_tree)
+        return (yield _Request('PUT', f'/lol-perks/v1/pages/{page_id}', json.dumps(data), BACKGROUND))
+
+    def _change_summoners(self, spell_1, spell_2):
+        data = {
+            "spell1Id": gamedata.resolve('spells', spell_1),
+            "spell2Id": gamedata.resolve('spells', spell_2)
+        }
+        return (yield _Request('PATCH', '/lol-champ-select/v1/session/my-selection', json.dumps(data)))
+
+    def _get_player_champ_select(self, priority : int = INTERACTIVE):
+        cellID = -1
+        select = yield from self._get_json('/lol-champ-select/v1/session', priority)
+        team = select['myTeam']
+
+        for player in team:
+            if(player['summonerId'] == self.summoner_id):
+                cellID = player['cellId']
+        actions = []
+        for player in select['actions']:
+            for act in player:
+
+                if act['actorCellId'] == cellID:
+                    actions.append(act)
+        return actions
+
+    def _complete_action(self, action_id : int, champID):
+        data = json.dumps({'championId': gamedata.resolve('champions', champID),})
+        hover = yield _Request('PATCH', f'/lol-champ-select/v1/session/actions/{action_id}', data, CRITICAL)
+        lock = yield _Request('POST', f'/lol-champ-select/v1/session/actions/{action_id}/complete', data, CRITICAL)
+        return (hover.ok and lock.ok)
+
+    def _select_champ(self, champID):
+        summoner_data = yield from self._get_player_champ_select(CRITICAL)
+        for entry in summoner_data:
+            if entry['isAllyAction'] == True and entry['isInProgress'] == True:
+                return (yield from self._complete_action(entry['id'], champID))
+        return False
+
+
+class Client(_ClientBase):
     """
     A class to represent an active LOL client.
 
     Attributes:
     ----------
-    `session` : Session 
+    `session` : Session
         A requests.Session() object loaded with the login info for the LCU.
     `app_port` : str
         The port that the LCU chooses to connect to. Changes every time the client is launched.
+    `metrics` : dict
+        Number of requests and total seconds spent per (method, endpoint).
 
     Methods:
     ----------
-    `check_connection()` : bool 
+    `check_connection()` : bool
         Checks the connection to the client by retrieving current summoner at `/lol-summoner/v1/current-summoner`.
 
     `get_rune_pages()` : dict
@@ -52,7 +446,7 @@ class Client():
 
     `change_summoners`(`spell_1` : int, `spell_2` : int) : Response
         Changes the summoner spells to the new summoner IDs. Returns response code.
-    
+
     `get_game_phase()` : str
         Returns the current game phase.
 
@@ -62,6 +456,9 @@ class Client():
     select_champ(`champID`: int) : bool
         Locks in the champion with the specified ID. Returns true if lock was successful.
 
+    `complete_action`(`action_id` : int, `champID` : int) : bool
+        Hovers and locks in a champion for a known pick or ban action, without reading the champ select first.
+
     `get_req( str )` : Response
         Auxillary function to aid in making get requests with localhost and app port already filled into the url.
 
@@ -73,26 +470,29 @@ class Client():
 
     `post_req( str )` : Response
         Auxillary function to aid in making post requests with localhost and app port already filled into the url.
-
-    `__login()` : None
-        Private method to be run in initalization of Client object. Initalizes session object and connects to LCU.
     """
-    def __init__(self):
+    def __init__(self, rate_limit : float = 10.0, burst : int = 10):
         """
         Constructor for Client Object, connects to LCU API.
 
-        Returns : 
+        Parameters :
         -------------
-        `Client` 
+        `rate_limit` : float
+            Requests per second sent to the LCU, None for no limit. Lock ins are never limited.
+        `burst` : int
+            Number of requests that may be sent at once after being idle.
+
+        Returns :
+        -------------
+        `Client`
         """
-        self.session = None
-        self.app_port = ""
-        self.summoner_id = 0
-        self.__login()
-        if self.check_connection() == False:
-            raise ClientConnectionError('Unable to establish connection to League Client.')
+        _ClientBase.__init__(self, rate_limit, burst)
+
+    def _run(self, steps):
+        """Runs an endpoint generator, blocking on every request."""
+        return _drive(steps, self._transport.send)
 
-    
+    @tracing.traced(category = 'lcu')
     def check_connection(self):
         """
         Method to check if a sucessfull connection was established with the LCU API
@@ -101,11 +501,10 @@ class Client():
         -----------------
         `bool` : True when the connection is successful
         """
-        resp = self.get_req('/lol-summoner/v1/current-summoner')
-        self.summoner_id = resp.json()['summonerId']
-        return resp.ok
+        return self._run(self._check_connection())
+
 
-    
+    @tracing.traced(category = 'lcu')
     def get_pickable_champions(self):
         """
         Method to get all the pickable champion IDs for a given champ select.
@@ -115,9 +514,10 @@ class Client():
         `list` : full of champion IDs that can be picked
         """
 
-        return self.get_req('/lol-champ-select/v1/pickable-champion-ids').json()
+        return self._run(self._get_json('/lol-champ-select/v1/pickable-champion-ids'))
 
-    
+
+    @tracing.traced(category = 'lcu')
     def get_rune_pages(self):
         """
         Method to get all rune pages.
@@ -125,7 +525,7 @@ class Client():
         Returns
         -----------------
         `dict` : All availible rune page details, including default rune pages.
-        
+
         Contents of dict:
         -----------------------------------
         `autoModifiedSelections` : list
@@ -153,15 +553,16 @@ class Client():
         `selectedPerkIds : list(int)
 
         `subStyleId` : int
-        
+
         """
-        return self.get_req('/lol-perks/v1/pages').json()
+        return self._run(self._get_json('/lol-perks/v1/pages', BACKGROUND))
 
 
+    @tracing.traced(category = 'lcu')
     def get_current_page(self):
         """
         Method to return currently active rune page.
-        
+
         Returns
         -----------------
         `dict` : dictionary with runepage details.
@@ -193,11 +594,12 @@ class Client():
         `selectedPerkIds : [int]
 
         `subStyleId` : int
-        
+
         """
 
-        return self.get_req('/lol-perks/v1/currentpage').json()
+        return self._run(self._get_json('/lol-perks/v1/currentpage', BACKGROUND))
 
+    @tracing.traced(category = 'lcu')
     def change_current_page(self, name, primary_tree : int, perks : list, secondary_tree : int):
         """
         Method to change the current runepage to the specified new data.
@@ -207,230 +609,205 @@ class Client():
         name : str
             The new name of the rune page.
 
-        primary_tree : int
-            The ID of the new primary tree.
+        primary_tree : int | str
+            The ID or name of the new primary tree.
 
         perks : list
-            List of the intended perk IDs. Must have a length of 9.
+            List of the intended perk IDs or names. Must have a length of 9.
 
-        secondary_tree : int
-            ID of the secondary perk tree.     
+        secondary_tree : int | str
+            ID or name of the secondary perk tree.
 
-        Returns : 
+        Returns :
         --------------------
-        `Response` : the response object from the post request.
+        `Response` : the response object from the put request.
         """
-        data = self.get_current_page()
-        page_id = data['id']
-        data["name"] = name
-        data["selectedPerkIds"] = perks
-        data["primaryStyleId"] = primary_tree
-        data["subStyleId"] = secondary_tree
-        return self.put_req(f'/lol-perks/v1/pages/{page_id}', json.dumps(data))
+        return self._run(self._change_current_page(name, primary_tree, perks, secondary_tree))
 
+    @tracing.traced(category = 'lcu')
     def change_summoners(self, spell_1 : int, spell_2 : int):
         """
         Method to change the current summoner spells to new ones.
 
         Parameters :
         -------------
-        `spell_1` : int
-            ID code for the left summoner spell.
-        `spell_2` : int
-            ID code for the right summoner spell.
+        `spell_1` : int | str
+            ID code or name of the left summoner spell.
+        `spell_2` : int | str
+            ID code or name of the right summoner spell.
 
-        Returns : 
+        Returns :
         -------------
         `Response` : Response
             Returns response for the patch request.
         """
-        data = {
-            "spell1Id": spell_1,
-            "spell2Id": spell_2
-        }
-        return self.patch_req('/lol-champ-select/v1/session/my-selection', data = json.dumps(data))
+        return self._run(self._change_summoners(spell_1, spell_2))
 
 
+    @tracing.traced(category = 'lcu')
     def get_champ_select(self):
         """
         Method to return all data from a given champ select.
 
-        Returns : 
+        Returns :
         --------------------
         `dict` : all data from champ select
         """
-        return self.get_req('/lol-champ-select/v1/session').json()
-    
+        return self._run(self._get_json('/lol-champ-select/v1/session'))
+
+    @tracing.traced(category = 'lcu')
     def get_game_phase(self):
         """
         Method to return the current game phase.
 
-        Returns : 
+        Returns :
         -------------
         `str` : current game phase
         """
-        return self.get_req('/lol-gameflow/v1/gameflow-phase').json()
+        return self._run(self._get_json('/lol-gameflow/v1/gameflow-phase'))
 
+    @tracing.traced(category = 'lcu')
     def get_player_champ_select(self):
         """
         Method to get only the local players actions in champ select.
 
-        Returns : 
+        Returns :
         -----------------
         `list` : list of actions for the local player.
         """
-        cellID = -1
-        select = self.get_champ_select()
-        team = select['myTeam']
-
-        for player in team:
-            if(player['summonerId'] == self.summoner_id):
-                cellID = player['cellId']
-        actions = []
-        for player in select['actions']:
-            for act in player:
-
-                if act['actorCellId'] == cellID:
-                    actions.append(act)
-        return actions
+        return self._run(self._get_player_champ_select())
 
+    @tracing.traced(category = 'lcu')
     def select_champ(self, champID: int):
         """
         Method to lock in the champion with the specified ID.
 
-        Parameters : 
+        Parameters :
         -------------------
-        `ChampID` : int
-            ID that corresponds to the champion to be locked in.
+        `ChampID` : int | str
+            ID or name of the champion to be locked in.
 
-        Returns : 
+        Returns :
         ----------------
         `bool` : True if both the hover operation and the lock operation return code 200.
         """
-        cellID = -1
-        playerID = -1
-        summoner_data = self.get_player_champ_select()
-        data = {'championId': champID,}
-        for entry in summoner_data:
-            if entry['isAllyAction'] == True and entry['isInProgress'] == True:
-                playerID = entry['id']
-                hover = self.patch_req(f'/lol-champ-select/v1/session/actions/{playerID}', data = json.dumps(data))
-                lock = self.post_req(f'/lol-champ-select/v1/session/actions/{playerID}/complete', data = json.dumps(data))
-                return (hover.ok and lock.ok)
-        return False
+        return self._run(self._select_champ(champID))
 
-    def __login(self):
-        """
-        Method to be called in the constructor of Client in order to interface with the LCU API.
-        
+    @tracing.traced(category = 'lcu')
+    def complete_action(self, action_id : int, champID : int):
         """
-        auth = subprocess.run(args = ['wmic', 'PROCESS', 'WHERE', "name='LeagueClientUx.exe'", 'GET', 'commandline'],capture_output=True)
-        
-        #finding app port
-        index = str(auth).find('--app-port=')
-        self.app_port = (str(auth))[index+len('--app-port='):index+len('--app-port=') + 5]
-
-        #finding auth token
-        index = str(auth).find('--remoting-auth-token=')
-        auth_token = str(auth)[index+len('--remoting-auth-token='):index+len('--remoting-auth-token=')+len('_3qGJj4eNN8NKLBDpuBrqg')]
+        Method to hover and lock in a champion for a pick or ban action whose ID is already known.
 
-        #creating and encoding login 
-        login = f'riot:{auth_token}'
-        encodeLogin = 'Basic ' + (base64.b64encode(login.encode('ascii'))).decode('ascii')
+        Parameters :
+        -------------------
+        `action_id` : int
+            ID of the action, from the `actions` of the champ select session.
+        `ChampID` : int | str
+            ID or name of the champion to be picked or banned.
 
-        #creating session with login info
-        sess = requests.Session()
-        headers = {'Authorization' : encodeLogin,
-                    'User-Agent': 'insomnia/7.1.1',
-                    'Accept': '*/*'}
-        sess.headers.update(headers)
-        self.session = sess
+        Returns :
+        ----------------
+        `bool` : True if both the hover operation and the lock operation return code 200.
+        """
+        return self._run(self._complete_action(action_id, champID))
 
 
-    def put_req(self, endpoint : str, data : dict):
+    def put_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.put() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.put().
         """
-        return self.session.put('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return self._transport.send('PUT', endpoint, data, priority)
 
 
-    def post_req(self, endpoint : str, data : dict):
+    def post_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.post() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.post().
         """
-        return self.session.post('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return self._transport.send('POST', endpoint, data, priority)
 
 
-    def patch_req(self, endpoint : str, data : dict ):
+    def patch_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.patch() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.patch().
         """
-        return self.session.patch('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return self._transport.send('PATCH', endpoint, data, priority)
 
 
-    def get_req(self, endpoint : str):
+    def get_req(self, endpoint : str, priority : int = INTERACTIVE):
         """
         General method to make a requests.get() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         endpoint : str
             The endpoint for the LCU API.
+        priority : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
         Returns
         -----------------
-         `Response` : Response from requests.put().
+         `Response` : Response from requests.get().
         """
-        return self.session.get('https://127.0.0.1:' + self.app_port + endpoint, verify = False)
+        return self._transport.send('GET', endpoint, priority = priority)
 
-    
-class Async_Client():
+
+class Async_Client(_ClientBase):
 
     """
     A class to represent an active LOL client with asyncronus support.
 
+    Requests are sent from a worker thread, so awaiting them never blocks the event loop.
+
     Attributes:
     ----------
-    `session` : Session 
+    `session` : Session
         A requests.Session() object loaded with the login info for the LCU.
     `app_port` : str
         The port that the LCU chooses to connect to. Changes every time the client is launched.
+    `metrics` : dict
+        Number of requests and total seconds spent per (method, endpoint).
 
     Methods:
     ----------
-    `async check_connection()` : bool 
+    `async check_connection()` : bool
         Checks the connection to the client by retrieving current summoner at `/lol-summoner/v1/current-summoner`.
 
     `async get_rune_pages()` : dict
@@ -447,45 +824,63 @@ class Async_Client():
 
     `async change_summoners`(`spell_1` : int, `spell_2` : int) : Response
         Changes the summoner spells to the new summoner IDs. Returns response code.
-    
+
     `async get_game_phase()` : str
         Returns the current game phase.
-        
+
      `async get_player_champ_select()` : list
         Returns a list of actions for the current champ select
 
     `async select_champ`(`champID`: int) : bool
         Locks in the champion with the specified ID. Returns true if lock was successful.
 
-    `get_req( str )` : Response
+    `async complete_action`(`action_id` : int, `champID` : int) : bool
+        Hovers and locks in a champion for a known pick or ban action, without reading the champ select first.
+
+    `async get_req( str )` : Response
         Auxillary function to aid in making get requests with localhost and app port already filled into the url.
 
-    `patch_req( str )` : Response
+    `async patch_req( str )` : Response
         Auxillary function to aid in making patch requests with localhost and app port already filled into the url.
 
-    `put_req( str )` : Response
+    `async put_req( str )` : Response
         Auxillary function to aid in making put requests with localhost and app port already filled into the url.
 
-    `post_req( str )` : Response
+    `async post_req( str )` : Response
         Auxillary function to aid in making post requests with localhost and app port already filled into the url.
-
-    `__login()` : None
-        Private method to be run in initalization of Client object. Initalizes session object and connects to LCU.
     """
-    def __init__(self):
+    def __init__(self, rate_limit : float = 10.0, burst : int = 10):
         """
         Constructor for Client Object, connects to LCU API.
 
-        Returns : 
+        Parameters :
+        -------------
+        `rate_limit` : float
+            Requests per second sent to the LCU, None for no limit. Lock ins are never limited.
+        `burst` : int
+            Number of requests that may be sent at once after being idle.
+
+        Returns :
         -------------
-        `Client` 
+        `Client`
         """
-        self.session = None
-        self.app_port = ""
-        self.summoner_id = 0
-        self.__login()
+        _ClientBase.__init__(self, rate_limit, burst)
+
+    async def _send(self, method : str, endpoint : str, data = None, priority : int = INTERACTIVE):
+        """Sends one request from a worker thread."""
+        return await self._transport.send_async(method, endpoint, data, priority)
 
-    
+    async def _run(self, steps):
+        """Runs an endpoint generator, awaiting every request."""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(await self._send(*request))
+        except StopIteration as done:
+            return done.value
+
+
+    @tracing.traced(category = 'lcu')
     async def check_connection(self):
         """
         Method to check if a sucessfull connection was established with the LCU API
@@ -494,11 +889,11 @@ class Async_Client():
         -----------------
         `bool` : True when the connection is successful
         """
-        response = await self.get_req('/lol-summoner/v1/current-summoner')
-        return response.ok
-        
+        return await self._run(self._check_connection())
+
 
-    
+
+    @tracing.traced(category = 'lcu')
     async def get_pickable_champions(self):
         """
         Method to get all the pickable champion IDs for a given champ select.
@@ -507,10 +902,10 @@ class Async_Client():
         -----------------
         `list` : full of champion IDs that can be picked
         """
-        pickable_champs = await self.get_req('/lol-champ-select/v1/pickable-champion-ids')
-        return pickable_champs.json()
+        return await self._run(self._get_json('/lol-champ-select/v1/pickable-champion-ids'))
+
 
-    
+    @tracing.traced(category = 'lcu')
     async def get_rune_pages(self):
         """
         Method to get all rune pages.
@@ -518,7 +913,7 @@ class Async_Client():
         Returns
         -----------------
         `dict` : All availible rune page details, including default rune pages.
-        
+
         Contents of dict:
         -----------------------------------
         `autoModifiedSelections` : list
@@ -546,16 +941,16 @@ class Async_Client():
         `selectedPerkIds : list(int)
 
         `subStyleId` : int
-        
+
         """
-        rune_pages = await self.get_req('/lol-perks/v1/pages')
-        return rune_pages.json()
+        return await self._run(self._get_json('/lol-perks/v1/pages', BACKGROUND))
 
 
+    @tracing.traced(category = 'lcu')
     async def get_current_page(self):
         """
         Method to return currently active rune page.
-        
+
         Returns
         -----------------
         `dict` : dictionary with runepage details.
@@ -587,11 +982,11 @@ class Async_Client():
         `selectedPerkIds : [int]
 
         `subStyleId` : int
-        
+
         """
-        current_page = await self.get_req('/lol-perks/v1/currentpage')
-        return current_page.json()
+        return await self._run(self._get_json('/lol-perks/v1/currentpage', BACKGROUND))
 
+    @tracing.traced(category = 'lcu')
     async def change_current_page(self, name, primary_tree : int, perks : list, secondary_tree : int):
         """
         Method to change the current runepage to the specified new data.
@@ -601,218 +996,181 @@ class Async_Client():
         name : str
             The new name of the rune page.
 
-        primary_tree : int
-            The ID of the new primary tree.
+        primary_tree : int | str
+            The ID or name of the new primary tree.
 
         perks : list
-            List of the intended perk IDs. Must have a length of 9.
+            List of the intended perk IDs or names. Must have a length of 9.
 
-        secondary_tree : int
-            ID of the secondary perk tree.     
+        secondary_tree : int | str
+            ID or name of the secondary perk tree.
 
-        Returns : 
+        Returns :
         --------------------
-        `Response` : the response object from the post request.
+        `Response` : the response object from the put request.
         """
-        data = await self.get_current_page()
-        data["name"] = name
-        data["selectedPerkIds"] = perks
-        data["primaryStyleId"] = primary_tree
-        data["subStyleId"] = secondary_tree
-        response = await self.post_req('/lol-perks/v1/currentpage', data = json.dumps(data))
-        return response
+        return await self._run(self._change_current_page(name, primary_tree, perks, secondary_tree))
 
+    @tracing.traced(category = 'lcu')
     async def change_summoners(self, spell_1 : int, spell_2 : int):
         """
         Method to change the current summoner spells to new ones.
 
         Parameters :
         -------------
-        `spell_1` : int
-            ID code for the left summoner spell.
-        `spell_2` : int
-            ID code for the right summoner spell.
+        `spell_1` : int | str
+            ID code or name of the left summoner spell.
+        `spell_2` : int | str
+            ID code or name of the right summoner spell.
 
-        Returns : 
+        Returns :
         -------------
         `Response` : Response
             Returns response for the patch request.
         """
-        data = {
-            "spell1Id": spell_1,
-            "spell2Id": spell_2
-        }
-        response = await self.patch_req('/lol-champ-select/v1/session/my-selection', data = json.dumps(data))
-        return response 
+        return await self._run(self._change_summoners(spell_1, spell_2))
 
 
+    @tracing.traced(category = 'lcu')
     async def get_champ_select(self):
         """
         Method to return all data from a given champ select.
 
-        Returns : 
+        Returns :
         --------------------
         `dict` : all data from champ select
         """
-        champ_select = await (self.get_req('/lol-champ-select/v1/session'))
+        return await self._run(self._get_json('/lol-champ-select/v1/session'))
 
-        return champ_select.json()
-    
+    @tracing.traced(category = 'lcu')
     async def get_game_phase(self):
         """
         Method to return the current game phase.
 
-        Returns : 
+        Returns :
         -------------
         `str` : current game phase
         """
-        game_phase = await self.get_req('/lol-gameflow/v1/gameflow-phase')
-        return game_phase.json()
+        return await self._run(self._get_json('/lol-gameflow/v1/gameflow-phase'))
 
+    @tracing.traced(category = 'lcu')
     async def get_player_champ_select(self):
         """
         Method to get only the local players actions in champ select.
 
-        Returns : 
+        Returns :
         -----------------
         `list` : list of actions for the local player.
         """
-        cellID = -1
-        select = await self.get_champ_select()
-        team = select['myTeam']
-        for player in team:
-            if(player['summonerId'] == self.summoner_id):
-                cellID = player['cellId']
-        actions = []
-        for player in select['actions']:
-            for act in player:
-
-                if act['actorCellId'] == cellID:
-                    actions.append(act)
-        return actions
+        return await self._run(self._get_player_champ_select())
 
+    @tracing.traced(category = 'lcu')
     async def select_champ(self, champID: int):
         """
         Method to lock in the champion with the specified ID.
 
-        Parameters : 
+        Parameters :
         -------------------
-        `ChampID` : int
-            ID that corresponds to the champion to be locked in.
+        `ChampID` : int | str
+            ID or name of the champion to be locked in.
 
-        Returns : 
+        Returns :
         ----------------
         `bool` : True if both the hover operation and the lock operation return code 200.
         """
-        cellID = -1
-        playerID = -1
-        summoner_data = await self.get_player_champ_select()
-        data = {'championId': champID,}
-        for entry in summoner_data:
-            if entry['isAllyAction'] == True and entry['isInProgress'] == True:
-                playerID = entry['id']
-                
-                hover = await self.patch_req(f'/lol-champ-select/v1/session/actions/{playerID}', data = json.dumps(data))
-                lock = await self.post_req(f'/lol-champ-select/v1/session/actions/{playerID}/complete', data = json.dumps(data))
-                return (hover.ok and lock.ok)
-        return False
-        
-    def __login(self):
-        """
-        Method to be called in the constructor of Client in order to interface with the LCU API.
-        
-        """
-        auth = subprocess.run(args = ['wmic', 'PROCESS', 'WHERE', "name='LeagueClientUx.exe'", 'GET', 'commandline'],capture_output=True)
-        
-        #finding app port
-        index = str(auth).find('--app-port=')
-        self.app_port = (str(auth))[index+len('--app-port='):index+len('--app-port=') + 5]
-
-        #finding auth token
-        index = str(auth).find('--remoting-auth-token=')
-        auth_token = str(auth)[index+len('--remoting-auth-token='):index+len('--remoting-auth-token=')+len('_3qGJj4eNN8NKLBDpuBrqg')]
-
-        #creating and encoding login 
-        login = f'riot:{auth_token}'
-        encodeLogin = 'Basic ' + (base64.b64encode(login.encode('ascii'))).decode('ascii')
-
-        #creating session with login info
-        sess = requests.Session()
-        headers = {'Authorization' : encodeLogin,
-                    'User-Agent': 'insomnia/7.1.1',
-                    'Accept': '*/*'}
-        sess.headers.update(headers)
-        self.session = sess
-        try:
-            self.summoner_id = self.session.get('https://127.0.0.1:' + self.app_port + '/lol-summoner/v1/current-summoner', verify = False).json()['summonerId']
-        except Exception as e:
-            raise ClientConnectionError('Unable to establish connection to League Client.')
+        return await self._run(self._select_champ(champID))
+
+    @tracing.traced(category = 'lcu')
+    async def complete_action(self, action_id : int, champID : int):
+        """
+        Method to hover and lock in a champion for a pick or ban action whose ID is already known.
+
+        Parameters :
+        -------------------
+        `action_id` : int
+            ID of the action, from the `actions` of the champ select session.
+        `ChampID` : int | str
+            ID or name of the champion to be picked or banned.
+
+        Returns :
+        ----------------
+        `bool` : True if both the hover operation and the lock operation return code 200.
+        """
+        return await self._run(self._complete_action(action_id, champID))
 
 
-    async def put_req(self, endpoint : str, data : dict):
+    async def put_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.put() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.put().
         """
-        return self.session.put('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return await self._send('PUT', endpoint, data, priority)
 
 
-    async def post_req(self, endpoint : str, data : dict):
+    async def post_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.post() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.post().
         """
-        return self.session.post('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return await self._send('POST', endpoint, data, priority)
 
 
-    async def patch_req(self, endpoint : str, data : dict ):
+    async def patch_req(self, endpoint : str, data : dict, priority : int = INTERACTIVE):
         """
         General method to make a requests.patch() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         `endpoint` : str
             The endpoint for the LCU API.
         `data` : dict
             Data to put at the specified endpoint.
-        
+        `priority` : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
+
         Returns
         -----------------
          `Response` : Response from requests.patch().
         """
-        return self.session.patch('https://127.0.0.1:' + self.app_port + endpoint, data = data, verify = False)
+        return await self._send('PATCH', endpoint, data, priority)
 
 
-    async def get_req(self, endpoint : str):
+    async def get_req(self, endpoint : str, priority : int = INTERACTIVE):
         """
         General method to make a requests.get() with localhost and app port already filled in.
-        
-        Parameters : 
+
+        Parameters :
         ----------------------
         endpoint : str
             The endpoint for the LCU API.
+        priority : int
+            CRITICAL, INTERACTIVE or BACKGROUND.
         Returns
         -----------------
-         `Response` : Response from requests.put().
+         `Response` : Response from requests.get().
         """
-        return self.session.get('https://127.0.0.1:' + self.app_port + endpoint, verify = False)
+        return await self._send('GET', endpoint, priority = priority)
@@ -0,0 +1,22 @@
+"""
+Handles the HTTP sessions used to talk to the local League Client and game.
+
+Methods:
+    `new_session()` -> requests.Session
+"""
+
+import warnings
+
+
+def new_session():
+    """
+    Creates a requests.Session, importing requests on first use.
+
+    The LCU and the Live Client API serve self-signed certificates on 127.0.0.1, so they are
+    called with verify = False. Only the warning urllib3 raises for those local requests is
+    silenced, and only once a session is created, so importing this package changes no state.
+    """
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+    warnings.filterwarnings('ignore', message = "Unverified HTTPS request is being made to host '127.0.0.1'", category = InsecureRequestWarning)
+    return requests.Session()
@@ -3,6 +3,7 @@ Handles classes and methods for an active local Game.
 
 Classes:
     `ActiveGame` - Represents an active LOL game
+    `AsyncActiveGame` - subclass of ActiveGame with asyncronus support
     `Player` - represents a player inside the game
     `ActivePlayer` - subclass of player, represents host
     `Item` - represents an item in game
@@ -15,11 +16,20 @@ Errors:
 
 Misc Variables:
 __version__
+
+requests, asyncio and hashlib are imported the first time they are needed, so importing
+this module is cheap and has no side effects.
 """
 
-import requests, json, random, time
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+import json
+import threading
+from collections import namedtuple
+import _local_http
+import tracing
+from stats import StatsEngine
+from gamedata import spell_id_from_raw
+from events import EventStore
+from inventory import InventoryTimeline
 
 class Error(Exception):
     """Base class for custom exceptions."""
@@ -37,10 +47,22 @@ class PlayerNotFoundException(Error):
 
 
 
+LIVE_CLIENT_URL = 'https://127.0.0.1:2999/liveclientdata/'
+
+_session = None
+
+def _live_session():
+    """Gets the requests.Session shared by every game, so connections to the Live Client are reused."""
+    global _session
+    if _session is None:
+        _session = _local_http.new_session()
+    return _session
+
+
 def check_status():
     """Checks if a player is in a live game, returns false if not in a game."""
     try:
-        output = requests.get('https://127.0.0.1:2999/liveclientdata/playerlist', verify = False)
+        output = _live_session().get(LIVE_CLIENT_URL + 'playerlist', verify = False)
     except:
         return False
     response = output.json()
@@ -63,7 +85,7 @@ class Item:
         Represents how many charges an item has left.
     `display_name` : str
         In-Game name of item.
-    `item_ID` :
+    `item_ID` : int
         ID of the item.
     `price` : int
         Cost of the item in the shop.
@@ -76,6 +98,7 @@ class Item:
         self.consumable = item_dict['consumable']
         self.count = item_dict['count']
         self.display_name = item_dict['displayName']
+        self.item_ID = item_dict['itemID']
         self.price = item_dict['price']
         self.slot = item_dict['slot']
     
@@ -102,6 +125,8 @@ class Player:
         the remaining time on the respawn timer
     `runes` : tuple(str) 
         a tuple of the basic rune paths in the format - (keystone, primaryTree, secondary Tree)
+    `rune_IDs` : tuple(int)
+        the IDs of `runes`, in the same order
     `score` : dict
         a dictionary that holds assists, creepScore, deaths, kills, and ward score
     `skin_ID` : int
@@ -110,6 +135,8 @@ class Player:
         name of the player
     `summoner_spells` : tuple(str)
         tuple of the two summoner spells 
+    `summoner_spell_IDs` : tuple(int)
+        the IDs of `summoner_spells`, 0 if the spell is not known
     `team` : str
         either CHAOS or ORDER
 
@@ -128,10 +155,12 @@ class Player:
         self.position = player_dict['position']
         self.respawn_timer = player_dict['respawnTimer']
         self.runes = (player_dict['runes']['keystone']['displayName'],player_dict['runes']['primaryRuneTree']['displayName'],player_dict['runes']['secondaryRuneTree']['displayName'])
+        self.rune_IDs = (player_dict['runes']['keystone']['id'],player_dict['runes']['primaryRuneTree']['id'],player_dict['runes']['secondaryRuneTree']['id'])
         self.scores = player_dict['scores']
         self.skin_ID = player_dict['skinID']
         self.summoner_name = player_dict['summonerName']
         self.summoner_spells = (player_dict['summonerSpells']['summonerSpellOne']['displayName'],player_dict['summonerSpells']['summonerSpellTwo']['displayName'])
+        self.summoner_spell_IDs = (spell_id_from_raw(player_dict['summonerSpells']['summonerSpellOne'].get('rawDisplayName', '')),spell_id_from_raw(player_dict['summonerSpells']['summonerSpellTwo'].get('rawDisplayName', '')))
         self.team = player_dict['team']
 
 
@@ -164,58 +193,242 @@ class ActivePlayer(Player):
 
     
 
+GameSnapshot = namedtuple('GameSnapshot', ['players', 'active_player', 'events', 'game_time', 'raw_players', 'raw_active_player'])
+GameSnapshot.__doc__ = """
+    An immutable, consistent view of an ActiveGame.
+
+    Attributes:
+    ----------
+    `players` : tuple[Player]
+        players in the game, the active player included
+    `active_player` : ActivePlayer
+        the host, or None if no players were loaded
+    `events` : tuple[dict]
+        all events in the game
+    `game_time` : float
+        game time in seconds
+    `raw_players` : list[dict]
+        the playerlist payload the players were built from
+    `raw_active_player` : dict
+        the activeplayer payload the active player was built from
+    """
+
+_EMPTY_SNAPSHOT = GameSnapshot((), None, (), 0.0, [], {})
+
+
 class ActiveGame:
     """ 
     A class to represent an active League of Legends Game.
 
     Attributes
     ----------
-    `eventList` : list[dict]
-        list of all events in the game
-    `players` : list[str]
-        list of players in current game
+    `event_list` : tuple[dict]
+        all events in the game
+    `players` : tuple[Player]
+        players in current game
     `friends`: list[dict]
         list of friends from friends.json
+    `game_time` : float
+        game time in seconds, from the latest event or gamestats update
+    `stats` : StatsEngine
+        derived per-player and per-team statistics, updated with every refresh
+    `raw_players` : list[dict]
+        the playerlist payload the players were built from
+    `raw_active_player` : dict
+        the activeplayer payload the active player was built from
+    `events` : EventStore
+        the newest events, indexed by type, player and time
+    `inventory` : InventoryTimeline
+        the items of every player by slot, and their purchase/sell/consume timeline
 
     Methods:
     ----------
     `updateEventList()`: bool
         updates the game event list
+    `updateGameStats()` : dict
+        updates the game time, returns the gamestats dict
     `getLastEvent()` : dict
         returns the most recent event, or None if no events happened
+    `snapshot()` : GameSnapshot
+        returns a consistent view of players, events and game time
+    `getFetchStats()` : dict
+        returns per endpoint how many fetches returned an unchanged payload
+
+    Change detection:
+    ----------
+    Every response body is fingerprinted with blake2b. When it matches the last body
+    of the same endpoint that was applied, decoding and object construction are skipped
+    and the published state is left as it is. When only activeplayer changed, only the
+    `ActivePlayer` is rebuilt and the other `Player` objects are kept.
+
+    Thread safety:
+    ----------
+    Every update builds its new state off to the side and publishes it by swapping
+    in a new `GameSnapshot`, so readers on other threads never see a half built
+    roster and never take a lock. Attribute reads each see a complete state; use
+    `snapshot()` to read several of them consistently. Updates from several threads
+    fetch concurrently, and are applied one at a time under a lock on top of the
+    latest published snapshot. An unchanged payload never brings back the older state
+    it was first seen with, and an event list without new events is not published.
     """
-    def __init__(self):
-        """Initializes a new instance of an active game."""
-        self.event_list = []
-        self.active_player = None
-        self.players = []
+    def __init__(self, event_capacity : int = 1000, spill_path : str = None):
+        """
+        Initializes a new instance of an active game.
+
+        Parameters:
+        -----------
+        `event_capacity` : int
+            number of events kept indexed in `events`
+        `spill_path` : str
+            file events evicted from `events` are appended to, None to drop them
+        """
+        self._reset(event_capacity, spill_path)
         
-        self.updateEventList()
+        #players are loaded first so that events can be credited to their teams
         self.loadPlayerList()
+        self.updateEventList()
+
+    def _reset(self, event_capacity : int, spill_path : str):
+        """Sets every attribute to the state of a game nothing was loaded for yet."""
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._write_lock = threading.Lock()
+        self.stats = StatsEngine()
+        self.events = EventStore(event_capacity, spill_path)
+        self.inventory = InventoryTimeline()
+        #endpoint -> [fingerprint, decoded payload, fetches, unchanged fetches]
+        self._bodies = {}
+        self._bodies_lock = threading.Lock()
+
+    def _decode(self, endpoint : str, response, error : str):
+        """
+        Decodes the body of a Live Client response, unless it did not change since the last one.
+
+        Returns:
+        -----------
+        `tuple` : the decoded payload and its fingerprint. The fingerprint is None when the body
+        did not change, the payload is then the object that was applied for it before.
+        """
+        from hashlib import blake2b
+        with tracing.span('decode', endpoint = endpoint):
+            try:
+                body = response.content
+            except Exception:
+                raise RequestError(error)
+            fingerprint = blake2b(body, digest_size = 16).digest()
+            with self._bodies_lock:
+                entry = self._bodies.get(endpoint)
+                if entry is None:
+                    entry = self._bodies[endpoint] = [None, None, 0, 0]
+                entry[2] += 1
+                if entry[0] == fingerprint:
+                    entry[3] += 1
+                    return entry[1], None
+            try:
+                return json.loads(body), fingerprint
+            except ValueError:
+                raise RequestError(error)
+
+    def _remember(self, endpoint : str, fingerprint : bytes, payload):
+        """Records a payload as applied, later bodies with the same fingerprint are skipped."""
+        with self._bodies_lock:
+            entry = self._bodies[endpoint]
+            entry[0], entry[1] = fingerprint, payload
+
+    def _fetch(self, endpoint : str, error : str):
+        """Gets a Live Client endpoint, returns the decoded payload and its fingerprint, None if unchanged."""
+        try:
+            with tracing.span('fetch', endpoint = endpoint):
+                response = _live_session().get(LIVE_CLIENT_URL + endpoint, verify = False)
+        except Exception:
+            raise RequestError(error)
+        return self._decode(endpoint, response, error)
+
+    def getFetchStats(self):
+        """Gets the number of fetches, unchanged fetches and the unchanged ratio of every endpoint."""
+        with self._bodies_lock:
+            return {endpoint : {'fetches' : entry[2], 'unchanged' : entry[3], 'unchanged_ratio' : entry[3] / entry[2]}
+                    for endpoint, entry in self._bodies.items()}
+
+    def snapshot(self):
+        """Gets the latest published GameSnapshot, it never changes after it is returned."""
+        return self._snapshot
+
+    @property
+    def players(self):
+        return self._snapshot.players
+
+    @property
+    def active_player(self):
+        return self._snapshot.active_player
+
+    @property
+    def event_list(self):
+        return self._snapshot.events
+
+    @property
+    def game_time(self):
+        return self._snapshot.game_time
+
+    @property
+    def raw_players(self):
+        return self._snapshot.raw_players
+
+    @property
+    def raw_active_player(self):
+        return self._snapshot.raw_active_player
+
+    @tracing.traced()
     def updateEventList(self):
         """Adds new Events to event_list, returns list of new events."""
         #gets json data from leagueAPI
+        return self._applyEventData(*self._fetch('eventdata', 'Unable to retrieve Game Events'))
 
-        temp_event_list = self.event_list
-        url = "https://127.0.0.1:2999/liveclientdata/eventdata"
+    def _applyEventData(self, output : dict, fingerprint : bytes):
+        """Applies a decoded eventdata payload, unless its fingerprint is None, returns list of new events."""
+        if fingerprint is None:
+            return []
         try:
-            response = requests.get(url, verify = False)
-            output = response.json()
-            self.event_list = output['Events']
-        except Exception:
+            events = output['Events']
+        except (KeyError, TypeError):
             raise RequestError('Unable to retrieve Game Events')
-        #checks if a new event has been added
-        eventIDList = []
-        newEvents = [] 
-        count = 0
-        for event in temp_event_list:
-            eventIDList.append(event['EventID'])
-        for event in self.event_list:
-            if not event['EventID'] in eventIDList:
-                newEvents.append(event)
+        with self._write_lock:
+            newEvents = self._applyEvents(events)
+            self._remember('eventdata', fingerprint, output)
+        return newEvents
+
+    def _applyEvents(self, events : list):
+        """Replaces event_list with `events` if it holds new events, returns list of new events. Requires `_write_lock`."""
+        with tracing.span('apply_events'):
+            snapshot = self._snapshot
+            #event IDs only grow, so the store keeps the new ones and skips the rest. A payload without
+            #new events was fetched before the published one, and must not replace it
+            newEvents = self.events.add(events)
+            if newEvents:
+                game_time = max(snapshot.game_time, newEvents[-1]['EventTime'])
+                with tracing.span('stats'):
+                    self.stats.add_events(newEvents)
+                self._snapshot = snapshot._replace(events = tuple(events), game_time = game_time)
         
         return newEvents
 
+    @tracing.traced()
+    def updateGameStats(self):
+        """Updates game_time from the gamestats endpoint, returns the gamestats dict."""
+        return self._applyGameStats(*self._fetch('gamestats', 'Unable to retrieve Game Stats'))
+
+    def _applyGameStats(self, output : dict, fingerprint : bytes):
+        """Applies a decoded gamestats payload, unless its fingerprint is None, returns it."""
+        if fingerprint is None:
+            return output
+        try:
+            game_time = output['gameTime']
+        except (KeyError, TypeError):
+            raise RequestError('Unable to retrieve Game Stats')
+        with self._write_lock:
+            self._snapshot = self._snapshot._replace(game_time = game_time)
+            self._remember('gamestats', fingerprint, output)
+        return output
+
     def getLastEvent(self):
         """Gets the most recent event in the event_list, returns None if event_list is empty."""
         if not self.event_list:
@@ -223,24 +436,83 @@ class ActiveGame:
         else:
             return self.event_list[-1]
 
-    def loadPlayerList(self):
-        try:
-            res = requests.get('https://127.0.0.1:2999/liveclientdata/playerlist', verify = False)
-            active = requests.get('https://127.0.0.1:2999/liveclientdata/activeplayer', verify = False)
-        except:
-            raise RequestError('Unable to retrieve playerlist')
-        output = res.json()
-
-        active_out = active.json()
-        
-        self.players.clear()
+    @tracing.traced()
+    def loadPlayerList(self, update_game_time : bool = True):
+        """
+        Rebuilds players and active_player from the playerlist and activeplayer endpoints, unless neither changed.
+
+        Parameters:
+        -----------
+        `update_game_time` : bool
+            fetch gamestats first, so stats and inventory changes are timed by this update. Pass
+            False when `updateGameStats()` was just called, to skip the second request.
+        """
+        if update_game_time:
+            self._applyGameStats(*self._fetch('gamestats', 'Unable to retrieve Game Stats'))
+        self._applyPlayerData(self._fetch('playerlist', 'Unable to retrieve playerlist'),
+                              self._fetch('activeplayer', 'Unable to retrieve playerlist'))
+
+    def _applyPlayerData(self, fetched_players : tuple, fetched_active : tuple):
+        """Applies fetched (payload, fingerprint) pairs of playerlist and activeplayer, unless neither changed."""
+        (output, players_fingerprint), (active_out, active_fingerprint) = fetched_players, fetched_active
+        if players_fingerprint is None and active_fingerprint is None:
+            return
+        #reading, building and publishing happen under one lock, and the applied bodies are remembered
+        #with it, so the remembered fingerprints always belong to the published snapshot
+        with self._write_lock:
+            snapshot = self._snapshot
+            #an unchanged payload may have been replaced by another thread since it was fetched,
+            #the published one is then the newer of the two
+            if players_fingerprint is None:
+                output = snapshot.raw_players
+            if active_fingerprint is None:
+                active_out = snapshot.raw_active_player
+            self._applyPlayers(output, active_out, snapshot)
+            if players_fingerprint is not None:
+                self._remember('playerlist', players_fingerprint, output)
+            if active_fingerprint is not None:
+                self._remember('activeplayer', active_fingerprint, active_out)
+
+    def _buildPlayers(self, output : list, active_out : dict, snapshot : GameSnapshot):
+        """
+        Builds the players and active player of decoded playerlist and activeplayer payloads.
+
+        When `output` is the playerlist `snapshot` was built from, only the active player is
+        rebuilt and every other `Player` of `snapshot` is kept.
+        """
+        previous = snapshot.active_player
+        if output is snapshot.raw_players and previous is not None and previous.summoner_name == active_out.get('summonerName'):
+            for index, user in enumerate(output):
+                if user['summonerName'] == previous.summoner_name:
+                    actPlayer = ActivePlayer(user, active_out)
+                    players = snapshot.players
+                    return players[:index] + (actPlayer,) + players[index + 1:], actPlayer
+        players = []
+        actPlayer = None
         for user in output: 
-            if Player(user).summoner_name == active_out['summonerName']:
+            if user['summonerName'] == active_out['summonerName']:
                 actPlayer = ActivePlayer(user, active_out)
-                self.players.append(actPlayer)
-                self.active_player = actPlayer
+                players.append(actPlayer)
             else:
-                self.players.append(Player(user))
+                players.append(Player(user))
+        return tuple(players), actPlayer
+
+    def _applyPlayers(self, output : list, active_out : dict, snapshot : GameSnapshot):
+        """Rebuilds players and active_player of the current `snapshot` from decoded payloads. Requires `_write_lock`."""
+        #the new roster is built aside and published in one swap, readers never see it half built
+        with tracing.span('build_players'):
+            try:
+                players, actPlayer = self._buildPlayers(output, active_out, snapshot)
+            except (KeyError, TypeError, AttributeError):
+                raise RequestError('Unable to retrieve playerlist')
+        if actPlayer is None:
+            actPlayer = snapshot.active_player
+        self._snapshot = snapshot._replace(players = players, active_player = actPlayer,
+                                           raw_players = output, raw_active_player = active_out)
+        with tracing.span('stats'):
+            self.stats.update(players, snapshot.game_time)
+        with tracing.span('inventory'):
+            self.inventory.update(players, snapshot.game_time)
             
 
     def isPlayerPresent(self, player:str):
@@ -259,7 +531,81 @@ class ActiveGame:
         raise PlayerNotFoundException('Could not find player in playerlist')
 
 
-    
-    
+class AsyncActiveGame(ActiveGame):
+    """
+    A subclass of ActiveGame with asyncronus support.
 
-    
+    The Live Client requests of an update run concurrently on the shared session,
+    each in a worker thread, so the event loop is never blocked and the game can be
+    tracked from the same loop as an `Async_Client`. Construct it with
+    `await AsyncActiveGame.create()`, or call `refresh()` on a new instance.
+
+    Methods:
+    ----------
+    `async create()` : AsyncActiveGame
+        creates a game and loads its players and events
+    `async update_events()` : list[dict]
+        updates the game event list, returns the new events
+    `async load_players(update_game_time)` : None
+        rebuilds the players, fetching playerlist, activeplayer and gamestats concurrently
+    `async update_game_stats()` : dict
+        updates the game time, returns the gamestats dict
+    `async refresh()` : list[dict]
+        fetches players, events and game stats concurrently, returns the new events
+    """
+    def __init__(self, event_capacity : int = 1000, spill_path : str = None):
+        """Initializes an empty game, nothing is loaded until an update is awaited."""
+        self._reset(event_capacity, spill_path)
+
+    @classmethod
+    async def create(cls, event_capacity : int = 1000, spill_path : str = None):
+        """Creates a new game and loads its players and events."""
+        game = cls(event_capacity, spill_path)
+        await game.refresh()
+        return game
+
+    async def _get(self, endpoint : str, error : str):
+        """Gets a Live Client endpoint without blocking the event loop, returns the decoded payload and whether it changed."""
+        import asyncio
+        try:
+            with tracing.span('fetch', endpoint = endpoint):
+                response = await asyncio.to_thread(_live_session().get, LIVE_CLIENT_URL + endpoint, verify = False)
+        except Exception:
+            raise RequestError(error)
+        return self._decode(endpoint, response, error)
+
+    @tracing.traced()
+    async def update_events(self):
+        """Adds new Events to event_list, returns list of new events."""
+        return self._applyEventData(*await self._get('eventdata', 'Unable to retrieve Game Events'))
+
+    @tracing.traced()
+    async def load_players(self, update_game_time : bool = True):
+        """Rebuilds players and active_player, fetching them and, unless `update_game_time` is False, the game time concurrently."""
+        import asyncio
+        requests = [self._get('playerlist', 'Unable to retrieve playerlist'), self._get('activeplayer', 'Unable to retrieve playerlist')]
+        if update_game_time:
+            requests.append(self._get('gamestats', 'Unable to retrieve Game Stats'))
+        fetched = await asyncio.gather(*requests)
+        if update_game_time:
+            self._applyGameStats(*fetched[2])
+        self._applyPlayerData(fetched[0], fetched[1])
+
+    @tracing.traced()
+    async def update_game_stats(self):
+        """Updates game_time from the gamestats endpoint, returns the gamestats dict."""
+        return self._applyGameStats(*await self._get('gamestats', 'Unable to retrieve Game Stats'))
+
+    @tracing.traced()
+    async def refresh(self):
+        """Fetches game stats, players and events concurrently and applies them, returns list of new events."""
+        import asyncio
+        stats, players, active, events = await asyncio.gather(
+            self._get('gamestats', 'Unable to retrieve Game Stats'),
+            self._get('playerlist', 'Unable to retrieve playerlist'),
+            self._get('activeplayer', 'Unable to retrieve playerlist'),
+            self._get('eventdata', 'Unable to retrieve Game Events'))
+        self._applyGameStats(*stats)
+        #players are applied first so that events can be credited to their teams
+        self._applyPlayerData(players, active)
+        return self._applyEventData(*events)
@@ -0,0 +1,224 @@
+"""
+Handles automatic bans, picks, summoner spells and runes in champ select.
+
+Classes:
+    `Loadout` - the summoner spells and rune page to use with a champion
+    `ChampSelectPlan` - ban priority, pick priority per position and loadouts per champion
+    `AutoPilot` - applies a plan to the champ select of a `Client`
+
+The plan is resolved to IDs once, when it is created. Every `AutoPilot.step()` reads
+the champ select session once, decides everything locally from that snapshot and only
+sends the writes that change something.
+"""
+
+import time
+
+import gamedata
+
+#position used for picks that apply whatever position was assigned
+ANY_POSITION = ''
+
+
+class Loadout:
+    """
+    A class to represent the summoner spells and rune page to use with a champion.
+
+    Attributes:
+    ----------
+    `spells` : tuple(int)
+        IDs of the two summoner spells, or None to leave them unchanged
+    `runes` : dict
+        keyword arguments for `Client.change_current_page`, with IDs, or None to leave the page unchanged
+    """
+    def __init__(self, spells : tuple = None, runes : dict = None):
+        """
+        Parameters:
+        -----------
+        `spells` : tuple
+            the two summoner spells, as IDs or names
+        `runes` : dict
+            `name`, `primary_tree`, `perks` and `secondary_tree`, as IDs or names
+        """
+        self.spells = None if spells is None else (gamedata.resolve('spells', spells[0]), gamedata.resolve('spells', spells[1]))
+        self.runes = None
+        if runes is not None:
+            self.runes = {
+                'name' : runes['name'],
+                'primary_tree' : gamedata.resolve('runes', runes['primary_tree']),
+                'perks' : [gamedata.resolve('runes', perk) for perk in runes['perks']],
+                'secondary_tree' : gamedata.resolve('runes', runes['secondary_tree']),
+            }
+
+
+class ChampSelectPlan:
+    """
+    A class to represent a declarative champ select plan.
+
+    Attributes:
+    ----------
+    `bans` : tuple(int)
+        champion IDs to ban, most wanted first
+    `picks` : dict[str, tuple(int)]
+        champion IDs to pick per assigned position (top, jungle, middle, bottom, utility),
+        most wanted first. Picks under `ANY_POSITION` are tried after the position's own.
+    `loadouts` : dict[int, Loadout]
+        loadout per champion ID
+
+    Methods:
+    ----------
+    `pick_order(position)` : tuple(int)
+        champion IDs to try for a position, in order
+    """
+    def __init__(self, bans = (), picks : dict = None, loadouts : dict = None):
+        """Creates a plan, resolving every champion, spell and rune name to its ID."""
+        self.bans = tuple(gamedata.resolve('champions', champ) for champ in bans)
+        self.picks = {position.lower() : tuple(gamedata.resolve('champions', champ) for champ in champs) for position, champs in (picks or {}).items()}
+        self.loadouts = {gamedata.resolve('champions', champ) : loadout for champ, loadout in (loadouts or {}).items()}
+        self._orders = {}
+
+    def pick_order(self, position : str):
+        """Gets the champion IDs to try for `position`, its own picks first and then the ANY_POSITION ones."""
+        position = (position or ANY_POSITION).lower()
+        order = self._orders.get(position)
+        if order is None:
+            order = tuple(dict.fromkeys(self.picks.get(position, ()) + self.picks.get(ANY_POSITION, ())))
+            self._orders[position] = order
+        return order
+
+
+def _my_action(session : dict):
+    """Gets the action of the local player that is in progress, or None."""
+    cell = session['localPlayerCellId']
+    for turn in session['actions']:
+        for action in turn:
+            if action['actorCellId'] == cell and action['isInProgress'] and not action['completed']:
+                return action
+    return None
+
+
+def _unavailable(session : dict):
+    """Gets the set of champion IDs that are banned, picked, or hovered by a teammate."""
+    cell = session['localPlayerCellId']
+    taken = set(session['bans']['myTeamBans'])
+    taken.update(session['bans']['theirTeamBans'])
+    for turn in session['actions']:
+        for action in turn:
+            if action['completed'] and action['championId']:
+                taken.add(action['championId'])
+    for player in session['myTeam'] + session['theirTeam']:
+        #the local player's own hover is not taken from them
+        if player['cellId'] != cell:
+            taken.add(player['championId'])
+            taken.add(player.get('championPickIntent', 0))
+    taken.discard(0)
+    return taken
+
+
+class AutoPilot:
+    """
+    A class that plays a `ChampSelectPlan` on a `Client`.
+
+    Attributes:
+    ----------
+    `client` : Client
+        the connected client to read the champ select from and write to
+    `plan` : ChampSelectPlan
+        what to ban, pick and use
+
+    Methods:
+    ----------
+    `decide(session, pickable)` : list[tuple]
+        computes the writes for one champ select snapshot, without any request
+    `step(session)` : list[tuple]
+        sends the writes decided for a champ select session, read once if not given
+    `run(interval)` : None
+        calls `step()` every `interval` seconds until champ select ends
+    """
+    def __init__(self, client, plan : ChampSelectPlan):
+        self.client = client
+        self.plan = plan
+        self._pickable = frozenset()
+        self._pickable_game = None
+        self._runes_for = None
+
+    def decide(self, session : dict, pickable = frozenset()):
+        """
+        Computes the writes for a champ select session, without sending any request.
+
+        Parameters:
+        -----------
+        `session` : dict
+            the champ select session, as returned by `Client.get_champ_select()`
+        `pickable` : set
+            the champion IDs the local player can pick
+
+        Returns:
+        -----------
+        `list[tuple]` : ('complete', action ID, champion ID), ('spells', spell 1, spell 2) and
+        ('runes', champion ID) decisions, in the order they should be sent.
+        """
+        decisions = []
+        cell = session['localPlayerCellId']
+        me = next((player for player in session['myTeam'] if player['cellId'] == cell), None)
+        if me is None:
+            return decisions
+        champion = me['championId']
+        action = _my_action(session)
+        if action is not None:
+            taken = _unavailable(session)
+            choice = None
+            if action['type'] == 'ban':
+                choice = next((champ for champ in self.plan.bans if champ not in taken), None)
+            elif action['type'] == 'pick':
+                choice = next((champ for champ in self.plan.pick_order(me.get('assignedPosition')) if champ in pickable and champ not in taken), None)
+                if choice is not None:
+                    champion = choice
+            if choice is not None:
+                decisions.append(('complete', action['id'], choice))
+        loadout = self.plan.loadouts.get(champion)
+        if loadout is not None:
+            if loadout.spells is not None and (me.get('spell1Id'), me.get('spell2Id')) != loadout.spells:
+                decisions.append(('spells',) + loadout.spells)
+            if loadout.runes is not None and self._runes_for != champion:
+                decisions.append(('runes', champion))
+        return decisions
+
+    def _pickable_for(self, session : dict):
+        """Gets the pickable champion IDs as a set, read once per champ select as `step()` resets them."""
+        if not self._pickable:
+            self._pickable = frozenset(self.client.get_pickable_champions())
+        return self._pickable
+
+    def step(self, session : dict = None):
+        """Sends the writes decided for `session`, or for the champ select read once if not given, returns the decisions."""
+        if session is None:
+            session = self.client.get_champ_select()
+        if 'actions' not in session:
+            return []
+        #what was written in a previous champ select does not count for this one
+        game = session.get('gameId')
+        if game != self._pickable_game:
+            self._pickable = frozenset()
+            self._runes_for = None
+            self._pickable_game = game
+        action = _my_action(session)
+        pickable = self._pickable_for(session) if action is not None and action['type'] == 'pick' else frozenset()
+        decisions = self.decide(session, pickable)
+        for decision in decisions:
+            if decision[0] == 'complete':
+                self.client.complete_action(decision[1], decision[2])
+            elif decision[0] == 'spells':
+                self.client.change_summoners(decision[1], decision[2])
+            elif decision[0] == 'runes':
+                self.client.change_current_page(**self.plan.loadouts[decision[1]].runes)
+                self._runes_for = decision[1]
+        return decisions
+
+    def run(self, interval : float = 0.5):
+        """Calls `step()` every `interval` seconds until the client leaves champ select."""
+        while True:
+            session = self.client.get_champ_select()
+            if 'actions' not in session:
+                return
+            self.step(session)
+            time.sleep(interval)
@@ -0,0 +1,203 @@
+"""
+Handles bulk analysis of recorded sessions over a pool of processes.
+
+Classes:
+    `RecordedGame` - the rebuilt state of one recorded session
+    `Reducer` - base class of the analyses run over recorded games
+    `ExportReducer` - collects the `players`, `items` and `events` tables of every game
+    `EventCountReducer` - counts the events of every type
+
+Methods:
+    `load_game(path)` -> RecordedGame
+    `shard(paths, count)` -> list[list[str]]
+    `analyze_sessions(paths, reducers, workers)` -> dict
+
+Session files are split into shards of about the same size, and every shard is
+analyzed by a worker process. Workers only receive the paths of their shard and
+only send back the partial results of the reducers, so `Player` objects and event
+lists never cross a process boundary. Tables pickle as their raw column arrays.
+
+Reducers are pickled to the workers, so they must be instances of module level
+classes. On platforms that spawn workers (Windows, macOS), `analyze_sessions`
+must be called under an `if __name__ == '__main__':` guard.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
+from itertools import repeat
+
+from export import ITEM_SCHEMA, EVENT_SCHEMA, PLAYER_SCHEMA, Table, build_players, export_game, read_session
+from inventory import InventoryTimeline
+from stats import StatsEngine
+
+#`event_list`, `players` and `game_time` are named like the `ActiveGame` attributes,
+#so a RecordedGame can be passed wherever a game is read, like `export.export_game`
+RecordedGame = namedtuple('RecordedGame', ('game_id', 'players', 'event_list', 'game_time', 'stats', 'inventory'))
+
+
+def load_game(path : str):
+    """
+    Rebuilds the state of a recorded session by replaying every snapshot.
+
+    Returns:
+    -----------
+    `RecordedGame` : players of the last snapshot, every event, and a `StatsEngine` and an
+    `InventoryTimeline` fed with every snapshot, or None if the session is empty.
+    """
+    stats = StatsEngine()
+    inventory = InventoryTimeline()
+    events = []
+    players = None
+    raw_players = raw_active = None
+    game_time = 0.0
+    for snapshot in read_session(path):
+        game_time = snapshot['gameTime']
+        #players are only rebuilt when the recorded payload changed
+        if players is None or snapshot['playerlist'] != raw_players or snapshot['activeplayer'] != raw_active:
+            raw_players, raw_active = snapshot['playerlist'], snapshot['activeplayer']
+            players = build_players(raw_players, raw_active)
+        stats.update(players, game_time)
+        inventory.update(players, game_time)
+        stats.add_events(snapshot['events'])
+        events.extend(snapshot['events'])
+    if players is None:
+        return None
+    return RecordedGame(str(path), players, events, game_time, stats, inventory)
+
+
+class Reducer(ABC):
+    """
+    A base class for an analysis over recorded games.
+
+    Each worker starts from `initial()` and calls `add()` for every game of its shard.
+    The partial results of the workers are combined with `merge()`, in shard order,
+    and `finish()` turns the combined result into the final one. Partial results are
+    sent between processes, so they should be small or columnar. Subclasses must
+    implement `add()` and `merge()`.
+
+    Methods:
+    ----------
+    `initial()` : object
+        an empty partial result
+    `add(partial, game)` : object
+        the partial result with one more `RecordedGame`
+    `merge(partial, other)` : object
+        two partial results combined
+    `finish(partial)` : object
+        the final result
+    """
+    def initial(self):
+        return None
+
+    @abstractmethod
+    def add(self, partial, game : RecordedGame):
+        """Returns `partial` with the results of one more game."""
+
+    @abstractmethod
+    def merge(self, partial, other):
+        """Returns two partial results combined, `other` coming from later shards."""
+
+    def finish(self, partial):
+        return partial
+
+
+class ExportReducer(Reducer):
+    """A reducer that collects the `export` tables of every game, as a dict of `Table`."""
+    def initial(self):
+        return {'players' : Table(PLAYER_SCHEMA), 'items' : Table(ITEM_SCHEMA), 'events' : Table(EVENT_SCHEMA)}
+
+    def add(self, partial, game):
+        for name, table in export_game(game, game.game_id).items():
+            partial[name].append(table)
+        return partial
+
+    def merge(self, partial, other):
+        for name, table in other.items():
+            partial[name].append(table)
+        return partial
+
+
+class EventCountReducer(Reducer):
+    """A reducer that counts the events of every EventName, as a `Counter`."""
+    def initial(self):
+        return Counter()
+
+    def add(self, partial, game):
+        partial.update(event['EventName'] for event in game.event_list)
+        return partial
+
+    def merge(self, partial, other):
+        partial.update(other)
+        return partial
+
+
+def shard(paths, count : int):
+    """Splits a list of paths into at most `count` consecutive shards holding about the same number of bytes."""
+    paths = list(paths)
+    if count <= 1 or len(paths) <= 1:
+        return [paths] if paths else []
+    sizes = [os.path.getsize(path) for path in paths]
+    target = sum(sizes) / count
+    shards = [[]]
+    filled = 0
+    for path, size in zip(paths, sizes):
+        if shards[-1] and filled + size / 2 > target * len(shards) and len(shards) < count:
+            shards.append([])
+        shards[-1].append(path)
+        filled += size
+    return shards
+
+
+def _run_shard(paths, reducers):
+    """Runs every reducer over the games of one shard, returns their partial results."""
+    partials = {name : reducer.initial() for name, reducer in reducers.items()}
+    for path in paths:
+        game = load_game(path)
+        if game is None:
+            continue
+        for name, reducer in reducers.items():
+            partials[name] = reducer.add(partials[name], game)
+    return partials
+
+
+def analyze_sessions(paths, reducers : dict, workers : int = None, shards_per_worker : int = 4):
+    """
+    Runs reducers over recorded session files, sharded across a pool of processes.
+
+    Parameters:
+    -----------
+    `paths` : iterable
+        session files written by `export.SessionRecorder`
+    `reducers` : dict[str, Reducer]
+        the analyses to run, by result name
+    `workers` : int
+        number of worker processes, defaults to the number of CPUs. With 1 worker
+        everything runs in the calling process.
+    `shards_per_worker` : int
+        number of shards per worker, more shards balance uneven sessions better
+
+    Returns:
+    -----------
+    `dict` : the finished result of every reducer, by name.
+    """
+    paths = [str(path) for path in paths]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    shards = shard(paths, workers * shards_per_worker if workers > 1 else 1)
+    results = {name : reducer.initial() for name, reducer in reducers.items()}
+
+    def combine(partials):
+        for name, reducer in reducers.items():
+            results[name] = reducer.merge(results[name], partials[name])
+
+    if workers == 1:
+        for paths in shards:
+            combine(_run_shard(paths, reducers))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            for partials in pool.map(_run_shard, shards, repeat(reducers)):
+                combine(partials)
+    return {name : reducer.finish(results[name]) for name, reducer in reducers.items()}
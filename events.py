@@ -0,0 +1,200 @@
+"""
+Handles the event history of an active local Game.
+
+Classes:
+    `EventStore` - a bounded, indexed store of game events
+
+Methods:
+    `involved_players(event)` -> set[str]
+
+Misc Variables:
+    `NAME_FIELDS` - event fields that name a player involved in the event
+"""
+
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import islice
+
+#fields of Live Client events that hold a summoner name
+NAME_FIELDS = ('KillerName', 'VictimName', 'Recipient', 'Acer')
+
+
+def involved_players(event : dict):
+    """Returns the set of summoner names involved in an event, assisters included."""
+    names = set()
+    for field in NAME_FIELDS:
+        name = event.get(field)
+        if isinstance(name, str) and name:
+            names.add(name)
+    names.update(event.get('Assisters', ()))
+    return names
+
+
+class _Index:
+    """A time ordered list of events that forgets its oldest entries in O(1)."""
+    def __init__(self):
+        self.events = []
+        self.times = []
+        self.start = 0
+
+    def append(self, event):
+        self.events.append(event)
+        self.times.append(event['EventTime'])
+
+    def evict(self, event):
+        """Forgets `event` if it is the oldest entry, compacting the lists when half of them is forgotten."""
+        if self.start < len(self.events) and self.events[self.start] is event:
+            self.start += 1
+            if self.start * 2 >= len(self.events):
+                del self.events[:self.start]
+                del self.times[:self.start]
+                self.start = 0
+
+    def __len__(self):
+        return len(self.events) - self.start
+
+    def range(self, since, until):
+        """Gets the events with `since <= EventTime <= until`, None meaning unbounded."""
+        low = self.start if since is None else bisect_left(self.times, since, self.start)
+        high = len(self.times) if until is None else bisect_right(self.times, until, self.start)
+        return self.events[low:high]
+
+
+class EventStore:
+    """
+    A class to represent the event history of a game.
+
+    The newest `capacity` events are kept in memory in a ring buffer, indexed by
+    event type, by involved player and by time. Older events are dropped from the
+    indexes and, when a `spill_path` is set, appended to that file as JSON lines.
+
+    Attributes:
+    ----------
+    `capacity` : int
+        number of events kept in memory
+    `spill_path` : str
+        file evicted events are appended to, or None to drop them
+    `last_id` : int
+        EventID of the newest event, -1 if there is none
+
+    Methods:
+    ----------
+    `add(events)` : list[dict]
+        adds the events newer than `last_id`, returns them
+    `query(event_name, player, since, until)` : list[dict]
+        events in memory matching every given filter, oldest first
+    `by_type(event_name, since, until)` : list[dict]
+        events in memory of one type
+    `involving(player, since, until)` : list[dict]
+        events in memory involving one player
+    `between(since, until)` : list[dict]
+        events in memory within a time range
+    `last(count)` : list[dict]
+        the newest `count` events
+    `spilled()` : generator
+        events evicted to `spill_path`, oldest first
+    """
+    def __init__(self, capacity : int = 1000, spill_path : str = None):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.last_id = -1
+        self._ring = deque()
+        self._all = _Index()
+        self._types = {}
+        self._players = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._ring)
+
+    def add(self, events):
+        """Adds the events with an EventID newer than `last_id`, returns the list of added events."""
+        with self._lock:
+            added = [event for event in events if event['EventID'] > self.last_id]
+            spill = []
+            for event in added:
+                self._ring.append(event)
+                self._all.append(event)
+                self._types.setdefault(event['EventName'], _Index()).append(event)
+                for name in involved_players(event):
+                    self._players.setdefault(name, _Index()).append(event)
+                if len(self._ring) > self.capacity:
+                    spill.append(self._evict())
+            if added:
+                self.last_id = added[-1]['EventID']
+            if spill and self.spill_path is not None:
+                with open(self.spill_path, 'a', encoding = 'utf-8') as spill_file:
+                    spill_file.writelines(json.dumps(event, separators = (',', ':')) + '\n' for event in spill)
+            return added
+
+    def _evict(self):
+        """Removes the oldest event from the ring buffer and every index, returns it."""
+        event = self._ring.popleft()
+        self._all.evict(event)
+        self._types[event['EventName']].evict(event)
+        for name in involved_players(event):
+            self._players[name].evict(event)
+        return event
+
+    def by_type(self, event_name : str, since : float = None, until : float = None):
+        """Gets the events in memory of type `event_name`, optionally within a time range."""
+        return self.query(event_name = event_name, since = since, until = until)
+
+    def involving(self, player : str, since : float = None, until : float = None):
+        """Gets the events in memory involving `player`, optionally within a time range."""
+        return self.query(player = player, since = since, until = until)
+
+    def between(self, since : float = None, until : float = None):
+        """Gets the events in memory with `since <= EventTime <= until`."""
+        return self.query(since = since, until = until)
+
+    def query(self, event_name : str = None, player : str = None, since : float = None, until : float = None):
+        """
+        Gets the events in memory matching every given filter, oldest first.
+
+        Parameters:
+        -----------
+        `event_name` : str
+            only events of this EventName
+        `player` : str
+            only events involving this summoner, as killer, victim or assister
+        `since`, `until` : float
+            only events within this range of game time, inclusive
+
+        Returns:
+        -----------
+        `list[dict]` : the matching events.
+        """
+        with self._lock:
+            candidates = [self._all]
+            if event_name is not None:
+                candidates.append(self._types.get(event_name, _Index()))
+            if player is not None:
+                candidates.append(self._players.get(player, _Index()))
+            #the smallest index is scanned, the other filters are checked per event
+            index = min(candidates, key = len)
+            events = index.range(since, until)
+        if event_name is not None and index is not candidates[1]:
+            events = [event for event in events if event['EventName'] == event_name]
+        if player is not None and index is not candidates[-1]:
+            events = [event for event in events if player in involved_players(event)]
+        return events
+
+    def last(self, count : int = 1):
+        """Gets the newest `count` events, oldest first."""
+        with self._lock:
+            return list(islice(reversed(self._ring), count))[::-1]
+
+    def spilled(self):
+        """Yields the events evicted to `spill_path`, oldest first."""
+        if self.spill_path is None:
+            return
+        try:
+            spill_file = open(self.spill_path, encoding = 'utf-8')
+        except FileNotFoundError:
+            return
+        with spill_file:
+            for line in spill_file:
+                yield json.loads(line)
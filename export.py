@@ -0,0 +1,453 @@
+"""
+Handles columnar export of active and recorded games for bulk analytics.
+
+Classes:
+    `Table` - a set of equally long, typed columns
+    `SessionRecorder` - records `ActiveGame` snapshots to a session file
+
+Methods:
+    `read_session(path)` -> generator
+    `build_players(playerlist, active_dict)` -> list[Player]
+    `export_game(game, game_id)` -> dict[str, Table]
+    `export_sessions(paths)` -> dict[str, Table]
+
+Tables:
+    `players` - one row per player per game, with scores, level, gold and item value
+    `items` - one row per item slot per player per game
+    `events` - one row per event per game, with the team credited for objectives
+
+Columns are stdlib arrays, and string columns are dictionary encoded into integer
+codes, so the module has no required dependencies.
+
+Optional dependencies:
+    `numpy` - `where()` and `value_counts()` run vectorized on the column arrays without
+        copying them, and `to_numpy()` is available. Without numpy they fall back to
+        Python loops over the rows, which give the same results but are much slower
+        on large tables; install numpy for bulk analytics.
+    `pyarrow` - `to_arrow()` and `to_parquet()` are available.
+"""
+
+import json
+from array import array
+
+from stats import credited_team
+
+PLAYER_SCHEMA = (
+    ('game_id', 'str'),
+    ('summoner_name', 'str'),
+    ('champion_name', 'str'),
+    ('team', 'str'),
+    ('position', 'str'),
+    ('is_bot', 'bool'),
+    ('level', 'int'),
+    ('kills', 'int'),
+    ('deaths', 'int'),
+    ('assists', 'int'),
+    ('creep_score', 'int'),
+    ('ward_score', 'float'),
+    ('gold', 'float'),
+    ('item_value', 'int'),
+    ('game_time', 'float'),
+)
+
+ITEM_SCHEMA = (
+    ('game_id', 'str'),
+    ('summoner_name', 'str'),
+    ('slot', 'int'),
+    ('item_id', 'int'),
+    ('display_name', 'str'),
+    ('count', 'int'),
+    ('price', 'int'),
+    ('consumable', 'bool'),
+)
+
+EVENT_SCHEMA = (
+    ('game_id', 'str'),
+    ('event_id', 'int'),
+    ('event_name', 'str'),
+    ('event_time', 'float'),
+    ('killer_name', 'str'),
+    ('victim_name', 'str'),
+    ('team', 'str'),
+)
+
+_TYPECODES = {'int' : 'q', 'float' : 'd', 'bool' : 'b'}
+
+
+def _numpy():
+    """Returns the numpy module, or None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class StringColumn:
+    """
+    A dictionary encoded column of strings.
+
+    Attributes:
+    ----------
+    `codes` : array
+        one integer code per row
+    `categories` : list[str]
+        the distinct values, indexed by code
+    """
+    def __init__(self):
+        self.codes = array('i')
+        self.categories = []
+        self._index = {}
+
+    def code(self, value):
+        """Gets the code of a value, adding it to the categories if it is new."""
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.categories)
+            self._index[value] = code
+            self.categories.append(value)
+        return code
+
+    def extend(self, values):
+        """Appends an iterable of strings."""
+        self.codes.extend(self.code(value) for value in values)
+
+    def extend_column(self, other):
+        """Appends another `StringColumn`, mapping its codes instead of decoding every row."""
+        mapping = [self.code(value) for value in other.categories]
+        self.codes.extend(mapping[code] for code in other.codes)
+
+    def find(self, value):
+        """Gets the code of a value, or -1 if the column never holds it."""
+        return self._index.get(value, -1)
+
+    def take(self, indices):
+        """Returns a new column holding only the rows at `indices`."""
+        column = StringColumn()
+        column.categories = self.categories
+        column._index = self._index
+        codes = self.codes
+        column.codes = array('i', [codes[i] for i in indices])
+        return column
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[code] for code in self.codes)
+
+    def __getstate__(self):
+        #the index is rebuilt from the categories, so only the codes and categories are pickled
+        return (self.codes, self.categories)
+
+    def __setstate__(self, state):
+        self.codes, self.categories = state
+        self._index = {value : code for code, value in enumerate(self.categories)}
+
+
+def _new_column(kind):
+    """Returns an empty column for a schema type."""
+    if kind == 'str':
+        return StringColumn()
+    return array(_TYPECODES[kind])
+
+
+class Table:
+    """
+    A class to represent a columnar table.
+
+    Attributes:
+    ----------
+    `schema` : tuple[tuple[str, str]]
+        (name, type) of every column, type is one of str, int, float, bool
+    `columns` : dict
+        column name to `array` or `StringColumn`
+
+    Methods:
+    ----------
+    `extend(rows)` : None
+        appends a batch of row tuples in schema order
+    `where(**conditions)` : Table
+        rows whose columns equal every given value
+    `value_counts(name)` : dict
+        number of rows per value of a column
+    `append(other)` : None
+        appends the rows of a table with the same schema
+    `concat(tables)` : Table
+        joins tables with the same schema
+    `to_pydict()` : dict
+        columns as plain lists
+    `to_numpy()` : dict
+        columns as numpy arrays, string columns are decoded
+    `to_arrow()` : pyarrow.Table
+        columns as a pyarrow table, string columns are dictionary encoded
+    `to_parquet(path)` : None
+        writes the table to a parquet file with pyarrow
+    """
+    def __init__(self, schema):
+        self.schema = tuple(schema)
+        self.columns = {name : _new_column(kind) for name, kind in self.schema}
+
+    @property
+    def num_rows(self):
+        """Number of rows in the table."""
+        if not self.schema:
+            return 0
+        return len(self.columns[self.schema[0][0]])
+
+    def __len__(self):
+        return self.num_rows
+
+    def extend(self, rows):
+        """Appends a batch of row tuples, each in schema order."""
+        rows = list(rows)
+        if not rows:
+            return
+        for (name, kind), values in zip(self.schema, zip(*rows)):
+            self.columns[name].extend(values)
+
+    def _mask(self, name, value, indices = None):
+        """Gets the indices of the rows, out of `indices` or all of them, where column `name` equals `value`."""
+        column = self.columns[name]
+        if isinstance(column, StringColumn):
+            data, value = column.codes, column.find(value)
+        else:
+            data = column
+        numpy = _numpy()
+        if numpy is not None:
+            #frombuffer shares the array memory, so this does not copy the column
+            data = numpy.frombuffer(data, dtype = data.typecode)
+            if indices is None:
+                return numpy.flatnonzero(data == value)
+            return indices[data[indices] == value]
+        #without numpy only the rows left by the previous conditions are compared
+        if indices is None:
+            return [index for index, item in enumerate(data) if item == value]
+        return [index for index in indices if data[index] == value]
+
+    def take(self, indices):
+        """Returns a new table holding only the rows at `indices`."""
+        table = Table(self.schema)
+        for name, kind in self.schema:
+            column = self.columns[name]
+            if isinstance(column, StringColumn):
+                table.columns[name] = column.take(indices)
+            else:
+                table.columns[name] = array(column.typecode, [column[i] for i in indices])
+        return table
+
+    def where(self, **conditions):
+        """Returns the rows whose columns equal every keyword argument, e.g. `where(event_name = 'DragonKill')`."""
+        indices = None
+        for name, value in conditions.items():
+            indices = self._mask(name, value, indices)
+        if indices is None:
+            return self
+        return self.take([int(index) for index in indices])
+
+    def value_counts(self, name):
+        """Gets a dict of the number of rows per distinct value of a column."""
+        column = self.columns[name]
+        if isinstance(column, StringColumn):
+            numpy = _numpy()
+            if numpy is not None and len(column):
+                counts = numpy.bincount(numpy.frombuffer(column.codes, dtype = 'i'), minlength = len(column.categories))
+            else:
+                counts = [0] * len(column.categories)
+                for code in column.codes:
+                    counts[code] += 1
+            return {value : int(count) for value, count in zip(column.categories, counts) if count}
+        counts = {}
+        for value in column:
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def append(self, other):
+        """Appends the rows of another table with the same schema."""
+        for name, kind in self.schema:
+            if kind == 'str':
+                self.columns[name].extend_column(other.columns[name])
+            else:
+                self.columns[name].extend(other.columns[name])
+
+    @staticmethod
+    def concat(tables):
+        """Joins a list of tables with the same schema into a new table."""
+        tables = list(tables)
+        table = Table(tables[0].schema)
+        for other in tables:
+            table.append(other)
+        return table
+
+    def to_pydict(self):
+        """Gets the table as a dict of plain lists."""
+        return {name : list(self.columns[name]) for name, kind in self.schema}
+
+    def to_numpy(self):
+        """Gets the table as a dict of numpy arrays, numeric columns share memory with the table."""
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError('to_numpy() requires numpy to be installed')
+        result = {}
+        for name, kind in self.schema:
+            column = self.columns[name]
+            if isinstance(column, StringColumn):
+                categories = numpy.array(column.categories, dtype = object)
+                result[name] = categories[numpy.frombuffer(column.codes, dtype = 'i')] if len(column) else numpy.array([], dtype = object)
+            else:
+                result[name] = numpy.frombuffer(column, dtype = column.typecode)
+        return result
+
+    def to_arrow(self):
+        """Gets the table as a pyarrow Table, string columns become dictionary arrays."""
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('to_arrow() requires pyarrow to be installed')
+        arrays = []
+        for name, kind in self.schema:
+            column = self.columns[name]
+            if isinstance(column, StringColumn):
+                arrays.append(pyarrow.DictionaryArray.from_arrays(pyarrow.array(column.codes, type = pyarrow.int32()), pyarrow.array(column.categories, type = pyarrow.string())))
+            elif kind == 'bool':
+                arrays.append(pyarrow.array(column, type = pyarrow.int8()).cast(pyarrow.bool_()))
+            else:
+                arrays.append(pyarrow.array(column))
+        return pyarrow.Table.from_arrays(arrays, names = [name for name, kind in self.schema])
+
+    def to_parquet(self, path : str):
+        """Writes the table to a parquet file, requires pyarrow."""
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(self.to_arrow(), path)
+
+
+def _player_rows(game_id, players, game_time):
+    """Yields `PLAYER_SCHEMA` rows for a list of `Player` objects."""
+    for player in players:
+        scores = player.scores
+        item_value = 0
+        for item in player.items:
+            item_value += item.price * item.count
+        yield (game_id, player.summoner_name, player.champion_name, player.team, player.position,
+               player.is_bot, player.level, scores['kills'], scores['deaths'], scores['assists'],
+               scores['creepScore'], scores['wardScore'], getattr(player, 'gold', 0.0), item_value, game_time)
+
+
+def _item_rows(game_id, players):
+    """Yields `ITEM_SCHEMA` rows for a list of `Player` objects."""
+    for player in players:
+        for item in player.items:
+            yield (game_id, player.summoner_name, item.slot, item.item_ID, item.display_name, item.count, item.price, item.consumable)
+
+
+def _event_rows(game_id, events, team_of):
+    """Yields `EVENT_SCHEMA` rows for a list of event dicts."""
+    for event in events:
+        killer = event.get('KillerName', event.get('Recipient', event.get('Acer', '')))
+        team = credited_team(event, team_of) or event.get('AcingTeam', '')
+        yield (game_id, event['EventID'], event['EventName'], event['EventTime'], killer, event.get('VictimName', ''), team)
+
+
+def _new_tables():
+    return {'players' : Table(PLAYER_SCHEMA), 'items' : Table(ITEM_SCHEMA), 'events' : Table(EVENT_SCHEMA)}
+
+
+def _add_game(tables, game_id, players, events, game_time):
+    """Appends one game worth of rows to a dict of tables."""
+    team_of = {player.summoner_name : player.team for player in players}
+    tables['players'].extend(_player_rows(game_id, players, game_time))
+    tables['items'].extend(_item_rows(game_id, players))
+    tables['events'].extend(_event_rows(game_id, events, team_of))
+
+
+def export_game(game, game_id : str = ''):
+    """Exports the current state of an `ActiveGame` to a dict of `players`, `items` and `events` tables."""
+    tables = _new_tables()
+    _add_game(tables, game_id, game.players, game.event_list, game.game_time)
+    return tables
+
+
+class SessionRecorder:
+    """
+    A class to record snapshots of an `ActiveGame` to a session file.
+
+    Session files hold one JSON object per line with the keys `gameTime`,
+    `playerlist`, `activeplayer` and `events`. `events` only holds the events
+    that were not in a previous line of the file.
+
+    Methods:
+    ----------
+    `record(game)` : None
+        appends the current snapshot of the game
+    `close()` : None
+        closes the session file
+    """
+    def __init__(self, path : str):
+        self.path = path
+        self._file = open(path, 'a', encoding = 'utf-8')
+        self._last_event_id = -1
+
+    def record(self, game):
+        """Appends the current snapshot of an `ActiveGame` to the session file."""
+        events = [event for event in game.event_list if event['EventID'] > self._last_event_id]
+        if events:
+            self._last_event_id = events[-1]['EventID']
+        line = {'gameTime' : game.game_time, 'playerlist' : game.raw_players,
+                'activeplayer' : game.raw_active_player, 'events' : events}
+        self._file.write(json.dumps(line, separators = (',', ':')) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_session(path : str):
+    """Yields the snapshot dicts stored in a session file, in recording order."""
+    with open(path, encoding = 'utf-8') as session:
+        for line in session:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_players(playerlist, active_dict):
+    """Builds `Player`/`ActivePlayer` objects from recorded payloads."""
+    from active import Player, ActivePlayer
+    players = []
+    for user in playerlist:
+        if active_dict and user['summonerName'] == active_dict.get('summonerName'):
+            players.append(ActivePlayer(user, active_dict))
+        else:
+            players.append(Player(user))
+    return players
+
+
+def export_sessions(paths):
+    """
+    Exports recorded session files to a dict of `players`, `items` and `events` tables.
+
+    Players are taken from the last snapshot of every session, events from all of them.
+    The game id of each session is its path, and each game is appended to the columns
+    as one batch.
+    """
+    tables = _new_tables()
+    for path in paths:
+        last = None
+        events = []
+        for snapshot in read_session(path):
+            events.extend(snapshot['events'])
+            last = snapshot
+        if last is None:
+            continue
+        players = build_players(last['playerlist'], last['activeplayer'])
+        _add_game(tables, str(path), players, events, last['gameTime'])
+    return tables
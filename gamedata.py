@@ -0,0 +1,234 @@
+"""
+Handles static game data, mapping IDs to names for items, runes, champions and summoner spells.
+
+Classes:
+    `GameData` - a versioned, lazily indexed store of game metadata
+
+Methods:
+    `default()` -> GameData
+    `resolve(category, value)` -> int
+    `spell_id_from_raw(raw_display_name)` -> int
+
+Errors:
+    `UnknownGameDataError(str)` - An ID or name is not in the store
+
+The store starts from the local cache written by `GameData.refresh()`, or from the
+bundled snapshot (`gamedata.json` next to this module) when there is no cache, so
+it works offline. `refresh()` reads the game version and assets from the League Client and
+only downloads them again when the patch changed.
+
+The bundled snapshot holds every champion, summoner spell, rune tree, rune and stat shard,
+but no items, since those change every patch. Item lookups raise `UnknownGameDataError`
+until `refresh()` has downloaded them.
+"""
+
+import json
+import os
+
+CATEGORIES = ('items', 'runes', 'champions', 'spells')
+
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gamedata.json')
+CACHE_PATH = os.path.join(os.environ.get('LEAGUEPKG_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'leaguepkg')), 'gamedata.json')
+
+#LCU endpoints holding the metadata of every category
+_ASSET_ENDPOINTS = {
+    'items' : '/lol-game-data/assets/v1/items.json',
+    'runes' : '/lol-game-data/assets/v1/perks.json',
+    'champions' : '/lol-game-data/assets/v1/champion-summary.json',
+    'spells' : '/lol-game-data/assets/v1/summoner-spells.json',
+}
+
+#internal spell keys, as found in the rawDisplayName of the Live Client API, which unlike
+#the display name does not depend on the client language
+SPELL_KEYS = {
+    'SummonerBoost' : 1,
+    'SummonerExhaust' : 3,
+    'SummonerFlash' : 4,
+    'SummonerHaste' : 6,
+    'SummonerHeal' : 7,
+    'SummonerSmite' : 11,
+    'SummonerTeleport' : 12,
+    'SummonerMana' : 13,
+    'SummonerDot' : 14,
+    'SummonerBarrier' : 21,
+    'SummonerSnowball' : 32,
+}
+
+_STYLES_ENDPOINT = '/lol-game-data/assets/v1/perkstyles.json'
+_VERSION_ENDPOINT = '/lol-patch/v1/game-version'
+
+
+class UnknownGameDataError(KeyError):
+    """Occurs when an ID or name cannot be found in the game data"""
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def _read(path):
+    """Returns the decoded snapshot at `path`, or None if it does not exist or is unreadable."""
+    try:
+        with open(path, encoding = 'utf-8') as snapshot:
+            return json.load(snapshot)
+    except (OSError, ValueError):
+        return None
+
+
+class GameData:
+    """
+    A class to represent a versioned store of game metadata.
+
+    Nothing is read from disk until the first lookup, and the name to ID index
+    of a category is only built the first time it is needed.
+
+    Attributes:
+    ----------
+    `version` : str
+        game version of the loaded snapshot, `bundled` for the bundled one
+    `cache_path` : str
+        where `refresh()` stores downloaded snapshots
+
+    Methods:
+    ----------
+    `name(category, id)` : str
+        gets the display name of an ID
+    `id(category, name)` : int
+        gets the ID of a display name, case insensitive
+    `item_name(id)`, `rune_name(id)`, `champion_name(id)`, `spell_name(id)` : str
+        shortcuts for `name()`
+    `item_id(name)`, `rune_id(name)`, `champion_id(name)`, `spell_id(name)` : int
+        shortcuts for `id()`
+    `refresh(client)` : bool
+        reloads the metadata from a `Client` if the game version changed
+    """
+    def __init__(self, path : str = None, cache_path : str = CACHE_PATH):
+        """Creates a store for the snapshot at `path`, or for the cache falling back to the bundled snapshot."""
+        self.cache_path = cache_path
+        self._path = path
+        self._data = None
+        self._indexes = {}
+
+    def _load(self):
+        """Reads the snapshot on first use and returns it."""
+        if self._data is None:
+            if self._path is not None:
+                data = _read(self._path)
+            else:
+                data = _read(self.cache_path) or _read(BUNDLED_PATH)
+            if data is None:
+                data = {'version' : '', **{category : {} for category in CATEGORIES}}
+            self._set(data)
+        return self._data
+
+    def _category(self, category : str):
+        """Gets the ID to name dict of a category, raises UnknownGameDataError if the snapshot has none."""
+        entries = self._load()[category]
+        if not entries:
+            raise UnknownGameDataError(f'No {category} in the loaded game data, call GameData.refresh(client) to download them')
+        return entries
+
+    def _set(self, data):
+        """Replaces the loaded snapshot, converting ID keys to int and dropping stale indexes."""
+        self._data = {'version' : data.get('version', '')}
+        for category in CATEGORIES:
+            self._data[category] = {int(key) : value for key, value in data.get(category, {}).items()}
+        self._indexes = {}
+
+    @property
+    def version(self):
+        return self._load()['version']
+
+    def name(self, category : str, id : int):
+        """Gets the display name of an ID in a category."""
+        entries = self._category(category)
+        try:
+            return entries[int(id)]
+        except KeyError:
+            raise UnknownGameDataError(f'Unknown {category} ID {id}')
+
+    def id(self, category : str, name : str):
+        """Gets the ID of a display name in a category, ignoring case."""
+        index = self._indexes.get(category)
+        if index is None:
+            index = {value.casefold() : key for key, value in self._category(category).items()}
+            self._indexes[category] = index
+        try:
+            return index[name.casefold()]
+        except KeyError:
+            raise UnknownGameDataError(f'Unknown {category} name {name}')
+
+    def item_name(self, id : int):
+        return self.name('items', id)
+
+    def rune_name(self, id : int):
+        return self.name('runes', id)
+
+    def champion_name(self, id : int):
+        return self.name('champions', id)
+
+    def spell_name(self, id : int):
+        return self.name('spells', id)
+
+    def item_id(self, name : str):
+        return self.id('items', name)
+
+    def rune_id(self, name : str):
+        return self.id('runes', name)
+
+    def champion_id(self, name : str):
+        return self.id('champions', name)
+
+    def spell_id(self, name : str):
+        return self.id('spells', name)
+
+    def refresh(self, client):
+        """
+        Reloads the metadata from the League Client when the game version changed.
+
+        Parameters:
+        -----------
+        `client` : Client
+            a connected `Client` from Client_interface
+
+        Returns:
+        -----------
+        `bool` : True if new metadata was loaded and written to `cache_path`.
+        """
+        version = client.get_req(_VERSION_ENDPOINT).json()
+        if version == self.version:
+            return False
+        data = {'version' : version}
+        for category, endpoint in _ASSET_ENDPOINTS.items():
+            data[category] = {entry['id'] : entry['name'] for entry in client.get_req(endpoint).json() if entry['id'] >= 0}
+        #rune trees are listed separately from the runes themselves
+        for style in client.get_req(_STYLES_ENDPOINT).json()['styles']:
+            data['runes'][style['id']] = style['name']
+        self._set(data)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok = True)
+        with open(self.cache_path, 'w', encoding = 'utf-8') as cache:
+            json.dump(data, cache)
+        return True
+
+
+def spell_id_from_raw(raw_display_name : str):
+    """Gets a summoner spell ID from a Live Client rawDisplayName, returns 0 if it is not known."""
+    for part in raw_display_name.split('_'):
+        if part in SPELL_KEYS:
+            return SPELL_KEYS[part]
+    return 0
+
+
+_default = None
+
+def default():
+    """Gets the shared `GameData` store, created on first use."""
+    global _default
+    if _default is None:
+        _default = GameData()
+    return _default
+
+
+def resolve(category : str, value):
+    """Returns `value` if it is already an ID, otherwise the ID of the display name in the shared store."""
+    if isinstance(value, str):
+        return default().id(category, value)
+    return value
@@ -0,0 +1,202 @@
+"""
+Handles the history of an active local Game, for rewinding to any earlier state.
+
+Classes:
+    `SnapshotHistory` - an append-only history of `GameSnapshot`s with structural sharing
+
+Every recorded snapshot shares whatever did not change with the snapshot recorded
+before it: unchanged players are the same `Player` objects, and changed players reuse
+the unchanged `Item` objects, item lists, rune tuples and score dicts of their previous
+version. Events are kept once and every snapshot only stores how many of them it holds,
+the `events` of a returned snapshot are a read-only view of that prefix, not a copy.
+Snapshots that change nothing are not stored at all, so memory grows with the number
+of changes, not with the number of polls.
+
+Record a snapshot after every poll, e.g.
+    history.record(game.snapshot())
+
+Recorded snapshots, and the players in them, must be treated as immutable. Recording
+never changes the snapshot it is given: a changed player is stored as a shallow copy
+that points to the shared parts.
+"""
+
+import copy
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from collections.abc import Sequence
+from itertools import islice
+
+from active import GameSnapshot
+
+#attributes of Player and ActivePlayer that are shared with the previous version when equal
+SHARED_ATTRIBUTES = ('runes', 'rune_IDs', 'scores', 'summoner_spells', 'summoner_spell_IDs',
+                     'abilities', 'champion_stats', 'full_runes', 'stat_runes')
+
+_Entry = namedtuple('_Entry', ['players', 'active_player', 'event_count', 'game_time', 'raw_players', 'raw_active_player'])
+
+
+def _item_key(item):
+    return (item.item_ID, item.slot, item.count, item.price, item.can_use, item.consumable, item.display_name)
+
+
+def _share_dict(new : dict, old : dict):
+    """Returns `old` if it equals `new`, otherwise `new` with the values that equal those of `old` replaced by them."""
+    if new == old:
+        return old
+    return {key : old[key] if key in old and old[key] == value else value for key, value in new.items()}
+
+
+def _shared_copy(new, old):
+    """Returns a shallow copy of player `new` whose attributes that equal those of `old` are the objects of `old`."""
+    shared = copy.copy(new)
+    for name in SHARED_ATTRIBUTES:
+        if hasattr(old, name) and getattr(new, name, None) == getattr(old, name):
+            setattr(shared, name, getattr(old, name))
+    old_items = {_item_key(item) : item for item in old.items}
+    items = [old_items.get(_item_key(item), item) for item in new.items]
+    if len(items) == len(old.items) and all(item is old_item for item, old_item in zip(items, old.items)):
+        shared.items = old.items
+    else:
+        shared.items = items
+    return shared
+
+
+class _EventView(Sequence):
+    """A read-only view of the first `count` events of an append-only list, built in O(1)."""
+    __slots__ = ('_events', '_count')
+
+    def __init__(self, events : list, count : int):
+        self._events = events
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._events[position] for position in range(*index.indices(self._count)))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('event index out of range')
+        return self._events[index]
+
+    def __iter__(self):
+        return islice(self._events, self._count)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(other) == self._count and all(event == other_event for event, other_event in zip(self, other))
+
+    def __repr__(self):
+        return '_EventView(%d events)' % self._count
+
+
+class SnapshotHistory:
+    """
+    A class to represent the history of a game, queried by game time.
+
+    Attributes:
+    ----------
+    `times` : array
+        game time of every stored snapshot, in recording order
+
+    Methods:
+    ----------
+    `record(snapshot)` : bool
+        stores a `GameSnapshot` if it changed anything, returns whether it did
+    `latest()` : GameSnapshot
+        the newest stored snapshot, None if nothing was stored
+    `state_at(game_time)` : GameSnapshot
+        the state of the game at `game_time`, None before the first snapshot
+    `range(since, until)` : list[GameSnapshot]
+        the stored snapshots with `since <= game_time <= until`
+    """
+    def __init__(self):
+        self.times = array('d')
+        self._entries = []
+        self._events = []
+        self._last_event_id = -1
+        #the players tuple of the last recorded snapshot, and the shared tuple stored for it
+        self._source = None
+        #summoner name -> (raw player dict, Player) of the last stored entry
+        self._previous = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, snapshot : GameSnapshot):
+        """Stores a `GameSnapshot`, sharing what did not change with the previous one. Returns False if nothing changed."""
+        last = self._entries[-1] if self._entries else None
+        if last is not None and snapshot.game_time < last.game_time:
+            raise ValueError('Snapshots must be recorded in game time order')
+        for event in snapshot.events:
+            if event['EventID'] > self._last_event_id:
+                self._events.append(event)
+                self._last_event_id = event['EventID']
+        players, active_player, raw_players, raw_active = self._share(snapshot, last)
+        if (last is not None and players is last.players and raw_active is last.raw_active_player
+                and len(self._events) == last.event_count):
+            return False
+        self._entries.append(_Entry(players, active_player, len(self._events), snapshot.game_time, raw_players, raw_active))
+        self.times.append(snapshot.game_time)
+        return True
+
+    def _share(self, snapshot, last):
+        """Returns the players, active player, raw players and raw active player of `snapshot`, shared with `last`."""
+        if last is None:
+            raw_active = snapshot.raw_active_player
+        else:
+            raw_active = _share_dict(snapshot.raw_active_player, last.raw_active_player)
+        if last is not None and snapshot.players is self._source:
+            return last.players, last.active_player, last.raw_players, raw_active
+        active_changed = last is None or raw_active is not last.raw_active_player
+        players = []
+        raw_players = []
+        active_player = None
+        previous = {}
+        for raw, player in zip(snapshot.raw_players, snapshot.players):
+            old = self._previous.get(raw['summonerName'])
+            is_active = player is snapshot.active_player
+            if old is not None and old[0] == raw and not (is_active and active_changed):
+                raw, player = old
+            elif old is not None:
+                raw = _share_dict(raw, old[0])
+                player = _shared_copy(player, old[1])
+            players.append(player)
+            raw_players.append(raw)
+            previous[player.summoner_name] = (raw, player)
+            if is_active:
+                active_player = player
+        if active_player is None:
+            active_player = snapshot.active_player
+        self._previous = previous
+        self._source = snapshot.players
+        if last is not None and len(players) == len(last.players) and all(new is old for new, old in zip(players, last.players)):
+            return last.players, last.active_player, last.raw_players, raw_active
+        return tuple(players), active_player, raw_players, raw_active
+
+    def _snapshot(self, entry):
+        return GameSnapshot(entry.players, entry.active_player, _EventView(self._events, entry.event_count),
+                            entry.game_time, entry.raw_players, entry.raw_active_player)
+
+    def latest(self):
+        """Gets the newest stored snapshot, None if nothing was stored."""
+        if not self._entries:
+            return None
+        return self._snapshot(self._entries[-1])
+
+    def state_at(self, game_time : float):
+        """Gets the last snapshot stored at or before `game_time`, None if there is none."""
+        index = bisect_right(self.times, game_time)
+        if index == 0:
+            return None
+        return self._snapshot(self._entries[index - 1])
+
+    def range(self, since : float = None, until : float = None):
+        """Gets the stored snapshots with `since <= game_time <= until`, oldest first, None meaning unbounded."""
+        low = 0 if since is None else bisect_left(self.times, since)
+        high = len(self.times) if until is None else bisect_right(self.times, until)
+        return [self._snapshot(self._entries[index]) for index in range(low, high)]
@@ -0,0 +1,213 @@
+"""
+Handles the item inventories of an active local Game over time.
+
+Classes:
+    `InventoryTimeline` - per-player inventories by slot, with an append-only transaction timeline
+    `Transaction` - one purchase, sale, consumption or combination of an item
+
+Misc Variables:
+    `ITEM_SLOTS` - number of inventory slots, the trinket included
+    `KINDS` - transaction kinds, in the order they are stored
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+ITEM_SLOTS = 7
+
+#`combine` is a non consumable item that disappeared in the same update something was bought,
+#which is how components show up when they are built into a finished item
+KINDS = ('purchase', 'sell', 'consume', 'combine')
+PURCHASE, SELL, CONSUME, COMBINE = range(len(KINDS))
+
+Transaction = namedtuple('Transaction', ['game_time', 'kind', 'item_ID', 'slot', 'count'])
+Transaction.__doc__ = """
+    One change of a player's inventory.
+
+    Attributes:
+    ----------
+    `game_time` : float
+        game time of the update the change was seen in
+    `kind` : str
+        one of `KINDS`
+    `item_ID` : int
+        ID of the item
+    `slot` : int
+        slot the item was added to, or removed from
+    `count` : int
+        number of items, or charges, added or removed
+    """
+
+
+class _History:
+    """The inventory states and transactions of one player, in flat arrays."""
+    def __init__(self):
+        #one entry per change: its game time and the 7 item IDs and counts after it
+        self.times = array('d')
+        self.item_IDs = array('l')
+        self.counts = array('l')
+        #one entry per transaction
+        self.transaction_times = array('d')
+        self.kinds = array('b')
+        self.transaction_items = array('l')
+        self.slots = array('b')
+        self.transaction_counts = array('l')
+
+    def state(self, index):
+        """Gets the inventory after change `index` as a tuple of (item ID, count) per slot."""
+        start = index * ITEM_SLOTS
+        return tuple(zip(self.item_IDs[start:start + ITEM_SLOTS], self.counts[start:start + ITEM_SLOTS]))
+
+    def transaction(self, index):
+        return Transaction(self.transaction_times[index], KINDS[self.kinds[index]], self.transaction_items[index],
+                           self.slots[index], self.transaction_counts[index])
+
+
+_EMPTY_INVENTORY = ((0, 0),) * ITEM_SLOTS
+
+
+class InventoryTimeline:
+    """
+    A class that keeps the inventory of every player by slot, and how it changed over time.
+
+    Every update compares the item IDs, counts and slots of each player with the
+    previous update and appends the differences as transactions. The full inventory
+    after every change is kept as well, so `state_at()` is a binary search instead
+    of a replay of the transactions.
+
+    Attributes:
+    ----------
+    `slots` : dict
+        maps summoner names to their index in `histories`
+
+    Methods:
+    ----------
+    `update(players, game_time)` : list[tuple]
+        applies a snapshot of `Player` objects, returns the new (summoner name, Transaction) pairs
+    `inventory(player)` : tuple
+        the current (item ID, count) of every slot
+    `state_at(player, game_time)` : tuple
+        the (item ID, count) of every slot at a game time
+    `transactions(player, kind, since, until)` : list[Transaction]
+        the transactions of a player, oldest first
+    `first_purchase(player, item_ID)` : float
+        game time an item was first bought, None if it never was
+    """
+    def __init__(self):
+        self.slots = {}
+        self.histories = []
+        self._sources = []
+        self._current = []
+        self._consumable = {}
+
+    def _history(self, name : str):
+        index = self.slots.get(name)
+        if index is None:
+            index = self.slots[name] = len(self.histories)
+            self.histories.append(_History())
+            self._sources.append(None)
+            self._current.append(_EMPTY_INVENTORY)
+        return index
+
+    def update(self, players, game_time : float):
+        """Applies a snapshot of `Player` objects taken at `game_time`, returns the new (summoner name, Transaction) pairs."""
+        added = []
+        for player in players:
+            index = self._history(player.summoner_name)
+            if self._sources[index] is player:
+                continue
+            self._sources[index] = player
+            history = self.histories[index]
+            new = [(0, 0)] * ITEM_SLOTS
+            for item in player.items:
+                if 0 <= item.slot < ITEM_SLOTS:
+                    new[item.slot] = (item.item_ID, item.count)
+                    self._consumable[item.item_ID] = item.consumable
+            new = tuple(new)
+            old = self._current[index]
+            if new == old:
+                continue
+            self._current[index] = new
+            for transaction in self._diff(old, new, game_time):
+                history.transaction_times.append(transaction.game_time)
+                history.kinds.append(KINDS.index(transaction.kind))
+                history.transaction_items.append(transaction.item_ID)
+                history.slots.append(transaction.slot)
+                history.transaction_counts.append(transaction.count)
+                added.append((player.summoner_name, transaction))
+            history.times.append(game_time)
+            for item_ID, count in new:
+                history.item_IDs.append(item_ID)
+                history.counts.append(count)
+        return added
+
+    def _diff(self, old, new, game_time):
+        """Returns the transactions that turn inventory `old` into `new`, purchases first."""
+        totals = {}
+        for side, inventory, other in ((0, old, new), (1, new, old)):
+            for slot, (item_ID, count) in enumerate(inventory):
+                if item_ID:
+                    #old count, new count, old slot, new slot
+                    entry = totals.get(item_ID)
+                    if entry is None:
+                        entry = totals[item_ID] = [0, 0, None, None]
+                    entry[side] += count
+                    #the first slot that changed is reported, rather than an untouched stack of the same item
+                    first = entry[2 + side]
+                    if first is None or (inventory[slot] != other[slot] and inventory[first] == other[first]):
+                        entry[2 + side] = slot
+        purchases = []
+        removals = []
+        for item_ID, (old_count, new_count, old_slot, new_slot) in totals.items():
+            if new_count > old_count:
+                purchases.append(Transaction(game_time, 'purchase', item_ID, new_slot, new_count - old_count))
+            elif new_count < old_count:
+                removals.append((item_ID, old_slot, old_count - new_count))
+        transactions = list(purchases)
+        for item_ID, slot, count in removals:
+            if self._consumable.get(item_ID):
+                kind = 'consume'
+            else:
+                kind = 'combine' if purchases else 'sell'
+            transactions.append(Transaction(game_time, kind, item_ID, slot, count))
+        return transactions
+
+    def inventory(self, player : str):
+        """Gets the current (item ID, count) of every slot of a player."""
+        return self._current[self.slots[player]]
+
+    def state_at(self, player : str, game_time : float):
+        """Gets the (item ID, count) of every slot of a player at `game_time`, empty slots are (0, 0)."""
+        history = self.histories[self.slots[player]]
+        index = bisect_right(history.times, game_time)
+        if index == 0:
+            return _EMPTY_INVENTORY
+        return history.state(index - 1)
+
+    def transactions(self, player : str, kind : str = None, since : float = None, until : float = None):
+        """
+        Gets the transactions of a player, oldest first.
+
+        Parameters:
+        -----------
+        `kind` : str
+            only transactions of this kind, one of `KINDS`
+        `since`, `until` : float
+            only transactions within this range of game time, inclusive
+        """
+        history = self.histories[self.slots[player]]
+        times = history.transaction_times
+        low = 0 if since is None else bisect_left(times, since)
+        high = len(times) if until is None else bisect_right(times, until)
+        kind_index = None if kind is None else KINDS.index(kind)
+        return [history.transaction(index) for index in range(low, high)
+                if kind_index is None or history.kinds[index] == kind_index]
+
+    def first_purchase(self, player : str, item_ID : int):
+        """Gets the game time `item_ID` was first bought by a player, None if it never was."""
+        history = self.histories[self.slots[player]]
+        for index, bought in enumerate(history.transaction_items):
+            if bought == item_ID and history.kinds[index] == PURCHASE:
+                return history.transaction_times[index]
+        return None
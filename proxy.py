@@ -0,0 +1,284 @@
+"""
+Handles a local read-through proxy that shares one Live Client poller with any number of consumers.
+
+A single `ActiveGame` polls the game client. Consumers read the cached responses
+from the proxy instead of `127.0.0.1:2999`, so the game client sees one poller no
+matter how many tools run.
+
+Classes:
+    `LiveClientProxy` - polls the active game and serves its cached responses
+
+Methods:
+    `serve(host, port, interval)` -> None
+
+Routes:
+    `GET /liveclientdata/<endpoint>` - the cached `playerlist`, `activeplayer`, `eventdata`,
+        `gamestats` or `allgamedata` body, 503 while no game is running
+    `GET /events` - a server-sent-events stream of new game events. Every event is sent
+        with its EventID as the SSE id, so a reconnecting consumer that sends
+        `Last-Event-ID` gets the events it missed. A `GameEnd` event is sent when the game ends.
+"""
+
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import active
+
+DEFAULT_PORT = 2998
+
+ENDPOINTS = ('playerlist', 'activeplayer', 'eventdata', 'gamestats', 'allgamedata')
+
+#seconds between keep-alive comments on idle event streams
+HEARTBEAT_INTERVAL = 15.0
+
+
+def _encode(payload):
+    return json.dumps(payload, separators = (',', ':')).encode()
+
+
+class LiveClientProxy:
+    """
+    A class that polls the active game once and serves it to local HTTP consumers.
+
+    Bodies are encoded once per change, not once per request: a payload that is the
+    same object as in the previous poll keeps its cached body.
+
+    Attributes:
+    ----------
+    `address` : tuple
+        (host, port) the server listens on
+    `interval` : float
+        seconds between polls of the game client
+    `game` : ActiveGame
+        the game being polled, None while no game is running
+
+    Methods:
+    ----------
+    `start()` : None
+        starts polling and serving in background threads
+    `serve_forever()` : None
+        starts polling and serves in the calling thread
+    `stop()` : None
+        stops polling and serving
+    `body(endpoint)` : bytes
+        the cached body of an endpoint, None while no game is running
+    `subscribe(last_event_id)` : queue.Queue
+        registers an event stream, queueing the events it missed
+    `unsubscribe(events)` : None
+        removes an event stream
+    """
+    def __init__(self, host : str = '127.0.0.1', port : int = DEFAULT_PORT, interval : float = 0.5):
+        self.interval = interval
+        self.game = None
+        self._bodies = {}
+        self._payloads = {}
+        self._subscribers = []
+        #EventID of the newest event sent to the streams, replays never go past it
+        self._broadcast_id = -1
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._poller = None
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        self.address = self._server.server_address
+
+    def start(self):
+        """Starts polling and serving in background threads."""
+        self._start_poller()
+        threading.Thread(target = self._server.serve_forever, daemon = True).start()
+
+    def serve_forever(self):
+        """Starts polling in a background thread and serves in the calling thread until `stop()`."""
+        self._start_poller()
+        self._server.serve_forever()
+
+    def _start_poller(self):
+        self._poller = threading.Thread(target = self._poll, daemon = True)
+        self._poller.start()
+
+    def stop(self):
+        """Stops polling and serving, closes every event stream."""
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for events in self._subscribers:
+                events.put(None)
+
+    def body(self, endpoint : str):
+        """Gets the cached body of an endpoint, None while no game is running."""
+        return self._bodies.get(endpoint)
+
+    def subscribe(self, last_event_id : int = None):
+        """
+        Registers a new event stream.
+
+        Parameters:
+        -----------
+        `last_event_id` : int
+            the last EventID the consumer has seen, the newer events still in memory that were
+            already streamed are queued first. Events that are not streamed yet arrive once, with
+            the next broadcast.
+
+        Returns:
+        -----------
+        `queue.Queue` : receives (event name, event id, body) tuples, and None when the proxy stops.
+        """
+        events = queue.Queue()
+        with self._lock:
+            game = self.game
+            if game is not None and last_event_id is not None:
+                for event in game.events.between():
+                    if last_event_id < event['EventID'] <= self._broadcast_id:
+                        events.put((event['EventName'], event['EventID'], _encode(event)))
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events : queue.Queue):
+        """Removes an event stream registered with `subscribe()`."""
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def _broadcast(self, name : str, event_id, body : bytes):
+        with self._lock:
+            if event_id is not None:
+                self._broadcast_id = event_id
+            for events in self._subscribers:
+                events.put((name, event_id, body))
+
+    def _poll(self):
+        """Polls the game client until the proxy stops, one game after the other."""
+        while not self._stopped.is_set():
+            if not active.check_status():
+                self._stopped.wait(self.interval)
+                continue
+            try:
+                game = active.ActiveGame()
+                with self._lock:
+                    self.game = game
+                    self._broadcast_id = -1
+                self._publish(game.updateGameStats(), game.event_list)
+                while not self._stopped.wait(self.interval):
+                    gamestats = game.updateGameStats()
+                    game.loadPlayerList(update_game_time = False)
+                    self._publish(gamestats, game.updateEventList())
+            except active.RequestError:
+                pass
+            with self._lock:
+                self.game = None
+                self._bodies = {}
+                self._payloads = {}
+            self._broadcast('GameEnd', None, b'{}')
+
+    def _publish(self, gamestats : dict, new_events):
+        """Updates the cached bodies of the payloads that changed, and streams the new events."""
+        snapshot = self.game.snapshot()
+        payloads = {
+            'playerlist' : snapshot.raw_players,
+            'activeplayer' : snapshot.raw_active_player,
+            'eventdata' : snapshot.events,
+            'gamestats' : gamestats,
+        }
+        bodies = dict(self._bodies)
+        changed = False
+        for endpoint, payload in payloads.items():
+            if self._payloads.get(endpoint) is not payload:
+                changed = True
+                bodies[endpoint] = _encode({'Events' : list(payload)} if endpoint == 'eventdata' else payload)
+        if changed:
+            bodies['allgamedata'] = _encode({'activePlayer' : snapshot.raw_active_player, 'allPlayers' : snapshot.raw_players,
+                                             'events' : {'Events' : list(snapshot.events)}, 'gameData' : gamestats})
+        #the new bodies are published in one swap, requests never see a half updated cache
+        self._payloads = payloads
+        self._bodies = bodies
+        for event in new_events:
+            self._broadcast(event['EventName'], event['EventID'], _encode(event))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the routes of a `LiveClientProxy`."""
+    protocol_version = 'HTTP/1.1'
+    #headers and body are written separately, Nagle would hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status : int, body : bytes, content_type : str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path == '/events':
+            self._stream()
+            return
+        prefix, _, endpoint = path.rpartition('/')
+        if prefix != '/liveclientdata' or endpoint not in ENDPOINTS:
+            self._send(404, b'{"error":"unknown endpoint"}')
+            return
+        body = self.server.proxy.body(endpoint)
+        if body is None:
+            self._send(503, b'{"error":"no active game"}')
+        else:
+            self._send(200, body)
+
+    def _stream(self):
+        """Streams events to the consumer until it disconnects or the proxy stops."""
+        proxy = self.server.proxy
+        last_event_id = self.headers.get('Last-Event-ID')
+        try:
+            last_event_id = int(last_event_id) if last_event_id is not None else None
+        except ValueError:
+            last_event_id = None
+        events = proxy.subscribe(last_event_id)
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.flush()
+            while True:
+                try:
+                    item = events.get(timeout = HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+                    continue
+                if item is None:
+                    return
+                name, event_id, body = item
+                message = b'event: ' + name.encode() + b'\n'
+                if event_id is not None:
+                    message += b'id: ' + str(event_id).encode() + b'\n'
+                self.wfile.write(message + b'data: ' + body + b'\n\n')
+                self.wfile.flush()
+        except OSError:
+            return
+        finally:
+            proxy.unsubscribe(events)
+
+
+def serve(host : str = '127.0.0.1', port : int = DEFAULT_PORT, interval : float = 0.5):
+    """Runs a `LiveClientProxy` in the calling thread until interrupted."""
+    proxy = LiveClientProxy(host, port, interval)
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,322 @@
+"""
+Handles sharing the state of an active local Game with other processes through a memory mapped file.
+
+One producer polls the Live Client with an `ActiveGame` and publishes every snapshot
+into the file. Any number of reader processes map the same file and read the latest
+players and events straight from the mapping, without any request to the game client.
+
+Classes:
+    `SnapshotWriter` - publishes `GameSnapshot`s into a mapped file
+    `SnapshotReader` - reads the latest published snapshot from a mapped file
+    `PlayerRecord` - the shared fields of a player
+    `EventRecord` - the shared fields of an event
+    `SharedSnapshot` - a consistent snapshot read from the file
+
+Methods:
+    `publish_game(path, interval)` -> None
+
+Errors:
+    `StoreError(str)` - the file is not a snapshot store, or could not be read consistently
+
+Layout:
+    The file starts with a `HEADER` of `HEADER_SIZE` bytes, followed by `player_capacity`
+    `PLAYER` records and `event_capacity` `EVENT` records. Strings are utf-8, zero padded
+    and truncated to their field size. Events are a ring: event number `n` (counted from 0)
+    is stored in record `n % event_capacity`.
+
+    The header holds a sequence counter. The writer makes it odd before changing the file
+    and even again once it is done, so a reader that sees the same even sequence before
+    and after reading knows it read one complete snapshot (a seqlock).
+"""
+
+import mmap
+import struct
+import time
+from collections import namedtuple
+
+from stats import TEAMS
+
+MAGIC = b'LOLS'
+LAYOUT_VERSION = 1
+
+#magic, layout version, player capacity, sequence, game time, player count, event count, event capacity, last EventID
+HEADER = struct.Struct('<4sHHQdIIIi')
+HEADER_SIZE = 64
+SEQUENCE_OFFSET = 8
+SEQUENCE = struct.Struct('<Q')
+#the parts of `HEADER` before and after the sequence, written separately so the sequence is stored last
+HEADER_START = struct.Struct('<4sHH')
+STATE_OFFSET = 16
+STATE = struct.Struct('<dIIIi')
+
+ITEM_SLOTS = 7
+
+#summoner, champion, position, team, is bot, is dead, level, kills, deaths, assists, creep score,
+#ward score, respawn timer, gold, summoner spell IDs, rune IDs, item IDs and item counts by slot
+PLAYER = struct.Struct('<48s32s8sB??BHHHHffd2I3I%dI%dH' % (ITEM_SLOTS, ITEM_SLOTS))
+
+#EventID, event time, event name, killer or recipient, victim
+EVENT = struct.Struct('<id24s48s48s')
+
+PlayerRecord = namedtuple('PlayerRecord', ['summoner_name', 'champion_name', 'position', 'team', 'is_bot', 'is_dead',
+                                           'level', 'kills', 'deaths', 'assists', 'creep_score', 'ward_score',
+                                           'respawn_timer', 'gold', 'summoner_spell_IDs', 'rune_IDs', 'item_IDs', 'item_counts'])
+
+EventRecord = namedtuple('EventRecord', ['event_id', 'event_time', 'event_name', 'killer_name', 'victim_name'])
+
+SharedSnapshot = namedtuple('SharedSnapshot', ['sequence', 'game_time', 'players', 'events', 'last_event_id'])
+SharedSnapshot.__doc__ = """
+    A consistent snapshot read from a snapshot store.
+
+    Attributes:
+    ----------
+    `sequence` : int
+        sequence counter of the snapshot, grows with every publish
+    `game_time` : float
+        game time in seconds
+    `players` : tuple[PlayerRecord]
+        players in the game
+    `events` : tuple[EventRecord]
+        the newest events still in the ring, oldest first
+    `last_event_id` : int
+        EventID of the newest event, -1 if there is none
+    """
+
+
+class StoreError(Exception):
+    """Occurs when a file is not a snapshot store or cannot be read consistently."""
+    def __init__(self, msg):
+        self.msg = msg
+
+
+def _text(value : bytes):
+    """Decodes a zero padded string field."""
+    return value.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+def _pack_player(player):
+    """Returns the `PLAYER` fields of a `Player`."""
+    scores = player.scores
+    item_ids = [0] * ITEM_SLOTS
+    item_counts = [0] * ITEM_SLOTS
+    for item in player.items:
+        if 0 <= item.slot < ITEM_SLOTS:
+            item_ids[item.slot] = item.item_ID
+            item_counts[item.slot] = item.count
+    team = TEAMS.index(player.team) if player.team in TEAMS else 255
+    return (player.summoner_name.encode(), player.champion_name.encode(), player.position.encode(), team,
+            player.is_bot, player.is_dead, player.level, scores['kills'], scores['deaths'], scores['assists'],
+            scores['creepScore'], scores['wardScore'], player.respawn_timer, getattr(player, 'gold', 0.0),
+            *player.summoner_spell_IDs, *player.rune_IDs, *item_ids, *item_counts)
+
+
+def _unpack_player(fields):
+    """Returns a `PlayerRecord` from unpacked `PLAYER` fields."""
+    team = TEAMS[fields[3]] if fields[3] < len(TEAMS) else ''
+    return PlayerRecord(_text(fields[0]), _text(fields[1]), _text(fields[2]), team, *fields[4:14],
+                        fields[14:16], fields[16:19], fields[19:19 + ITEM_SLOTS], fields[19 + ITEM_SLOTS:])
+
+
+class SnapshotWriter:
+    """
+    A class that publishes snapshots of an `ActiveGame` into a memory mapped file.
+
+    Only the parts that changed since the previous publish are written: players when
+    the snapshot holds a new roster, and events that are newer than the last one.
+
+    Attributes:
+    ----------
+    `path` : str
+        the mapped file
+    `player_capacity` : int
+        number of player records in the file
+    `event_capacity` : int
+        number of event records in the ring
+    `sequence` : int
+        sequence counter of the last publish
+
+    Methods:
+    ----------
+    `publish(snapshot)` : int
+        writes a `GameSnapshot`, returns the new sequence
+    `close()` : None
+        unmaps and closes the file
+    """
+    def __init__(self, path : str, player_capacity : int = 16, event_capacity : int = 256):
+        self.path = path
+        self.player_capacity = player_capacity
+        self.event_capacity = event_capacity
+        self.sequence = 0
+        self._players_offset = HEADER_SIZE
+        self._events_offset = HEADER_SIZE + player_capacity * PLAYER.size
+        size = self._events_offset + event_capacity * EVENT.size
+        self._file = open(path, 'w+b')
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._players = None
+        self._player_count = 0
+        self._event_count = 0
+        self._last_event_id = -1
+        self._game_time = 0.0
+        self._write_header()
+
+    def _write_header(self):
+        """Writes the header fields, then the sequence, so a reader never sees an even sequence before the fields."""
+        HEADER_START.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, self.player_capacity)
+        STATE.pack_into(self._map, STATE_OFFSET, self._game_time, self._player_count, self._event_count,
+                        self.event_capacity, self._last_event_id)
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self.sequence)
+
+    def publish(self, snapshot):
+        """Writes a `GameSnapshot` into the file, returns the new sequence."""
+        new_events = [event for event in snapshot.events if event['EventID'] > self._last_event_id]
+        #the sequence is odd while the file is being changed
+        self.sequence += 1
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self.sequence)
+        if snapshot.players is not self._players:
+            players = snapshot.players[:self.player_capacity]
+            for index, player in enumerate(players):
+                PLAYER.pack_into(self._map, self._players_offset + index * PLAYER.size, *_pack_player(player))
+            self._players = snapshot.players
+            self._player_count = len(players)
+        for event in new_events:
+            killer = event.get('KillerName', event.get('Recipient', event.get('Acer', '')))
+            offset = self._events_offset + (self._event_count % self.event_capacity) * EVENT.size
+            EVENT.pack_into(self._map, offset, event['EventID'], event['EventTime'], event['EventName'].encode(),
+                            str(killer).encode(), str(event.get('VictimName', '')).encode())
+            self._event_count += 1
+            self._last_event_id = event['EventID']
+        self._game_time = snapshot.game_time
+        #the header fields are written while the sequence is still odd, the even sequence last
+        self.sequence += 1
+        self._write_header()
+        return self.sequence
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotReader:
+    """
+    A class that reads the latest snapshot published into a memory mapped file.
+
+    Reads unpack the records straight from the shared mapping. Nothing else is
+    copied, and no request is made to the game client.
+
+    Attributes:
+    ----------
+    `path` : str
+        the mapped file
+    `sequence` : int
+        the current sequence counter, changes with every publish
+
+    Methods:
+    ----------
+    `read(since_event_id, retries)` : SharedSnapshot
+        the latest complete snapshot
+    `wait(sequence, timeout)` : bool
+        waits until a snapshot newer than `sequence` is published
+    `close()` : None
+        unmaps and closes the file
+    """
+    def __init__(self, path : str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise StoreError('Snapshot store is empty: ' + path)
+        magic, version, player_capacity = HEADER.unpack_from(self._map, 0)[:3]
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            self.close()
+            raise StoreError('Not a snapshot store: ' + path)
+        self._players_offset = HEADER_SIZE
+        self._events_offset = HEADER_SIZE + player_capacity * PLAYER.size
+
+    @property
+    def sequence(self):
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    def read(self, since_event_id : int = -1, retries : int = 1000):
+        """
+        Reads the latest complete snapshot.
+
+        Parameters:
+        -----------
+        `since_event_id` : int
+            only events with a greater EventID are read
+        `retries` : int
+            number of attempts while the writer is publishing
+
+        Returns:
+        -----------
+        `SharedSnapshot` : the snapshot.
+        """
+        buffer = self._map
+        for _ in range(retries):
+            before = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            header = HEADER.unpack_from(buffer, 0)
+            game_time, player_count, event_count, event_capacity, last_event_id = header[4:]
+            players = tuple(_unpack_player(PLAYER.unpack_from(buffer, self._players_offset + index * PLAYER.size))
+                            for index in range(player_count))
+            events = []
+            for number in range(max(0, event_count - event_capacity), event_count):
+                fields = EVENT.unpack_from(buffer, self._events_offset + (number % event_capacity) * EVENT.size)
+                if fields[0] > since_event_id:
+                    events.append(EventRecord(fields[0], fields[1], _text(fields[2]), _text(fields[3]), _text(fields[4])))
+            if SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] == before:
+                return SharedSnapshot(before, game_time, players, tuple(events), last_event_id)
+        raise StoreError('Snapshot store kept changing while it was read: ' + self.path)
+
+    def wait(self, sequence : int, timeout : float = None, interval : float = 0.01):
+        """Waits until the sequence differs from `sequence`, returns False if `timeout` seconds passed first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.sequence == sequence:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+        return True
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def publish_game(path : str, interval : float = 1.0, player_capacity : int = 16, event_capacity : int = 256):
+    """
+    Polls the active game and publishes it into a snapshot store until the game ends.
+
+    Waits for a game to start, then refreshes an `ActiveGame` every `interval` seconds
+    and publishes every refresh, so readers only ever see one poller on the game client.
+    """
+    import active
+    while not active.check_status():
+        time.sleep(interval)
+    game = active.ActiveGame()
+    with SnapshotWriter(path, player_capacity, event_capacity) as writer:
+        while True:
+            writer.publish(game.snapshot())
+            time.sleep(interval)
+            try:
+                game.updateGameStats()
+                game.loadPlayerList(update_game_time = False)
+                game.updateEventList()
+            except active.RequestError:
+                return
@@ -0,0 +1,210 @@
+"""
+Handles derived statistics for an active local Game.
+
+Classes:
+    `StatsEngine` - keeps per-player and per-team aggregates in columnar arrays
+
+Methods:
+    `credited_team(event, team_of)` -> str
+
+Misc Variables:
+    `TEAMS` - the two team names, in column order
+
+Net worth is the value of the items a player holds. The Live Client only reports the
+unspent gold of the active player, so it is kept in the `gold` column but left out of
+net worth, which would otherwise favour the active player's team.
+"""
+
+from array import array
+from bisect import bisect_right
+
+TEAMS = ('ORDER', 'CHAOS')
+
+PLAYER_COLUMNS = ('kills', 'deaths', 'assists', 'creep_score', 'ward_score', 'level', 'item_value', 'gold')
+
+#event names that count towards a team objective column
+OBJECTIVE_EVENTS = {
+    'DragonKill' : 'dragons',
+    'HeraldKill' : 'heralds',
+    'BaronKill' : 'barons',
+    'TurretKilled' : 'turrets',
+    'InhibKilled' : 'inhibitors',
+}
+
+TEAM_COLUMNS = PLAYER_COLUMNS + tuple(OBJECTIVE_EVENTS.values())
+
+
+def credited_team(event : dict, team_of : dict):
+    """Returns the name of the team credited with an objective event, or None if it cannot be told.
+
+    Structures are named after the team owning them, so their destruction is credited to the other
+    team. Anything else is credited to the team of `KillerName`, looked up in `team_of`.
+    """
+    structure = event.get('TurretKilled', event.get('InhibKilled'))
+    if structure:
+        if '_T1_' in structure:
+            return 'CHAOS'
+        if '_T2_' in structure:
+            return 'ORDER'
+    return team_of.get(event.get('KillerName'))
+
+
+def _player_row(player):
+    """Returns the column values of a player as a tuple in `PLAYER_COLUMNS` order."""
+    scores = player.scores
+    item_value = 0
+    for item in player.items:
+        item_value += item.price * item.count
+    return (scores['kills'], scores['deaths'], scores['assists'], scores['creepScore'],
+            scores['wardScore'], player.level, item_value, getattr(player, 'gold', 0))
+
+
+class StatsEngine:
+    """
+    A class that keeps derived statistics for all players in columnar arrays.
+
+    Every player gets a fixed slot, and every column holds one value per slot.
+    Team columns are kept up to date by applying the per-player deltas, so an
+    update only costs work for the players and columns that changed.
+
+    Attributes:
+    ----------
+    `slots` : dict
+        maps summoner names to their column slot
+    `teams` : array
+        team index (into `TEAMS`) of every slot
+    `columns` : dict[str, array]
+        one array per name in `PLAYER_COLUMNS`, indexed by slot
+    `team_columns` : dict[str, array]
+        one array per name in `TEAM_COLUMNS`, indexed by team
+    `game_time` : float
+        game time of the latest update
+
+    Methods:
+    ----------
+    `update(players, game_time)` : int
+        applies a new player snapshot, returns the number of players that changed
+    `add_events(events)` : int
+        applies new game events, returns the number of objectives counted
+    `gold_gained(player, window)` : float
+        net worth a player gained in the last `window` seconds
+    `team_gold_gained(team, window)` : float
+        net worth a team gained in the last `window` seconds
+    `gold_difference()` : float
+        item value of ORDER minus item value of CHAOS
+    `cs_per_minute(player)` : float
+        creep score per minute of game time
+    `kda(player)` : float
+        (kills + assists) / deaths, with deaths counted as at least 1
+    `team_totals(team)` : dict
+        every team column for the specified team
+    """
+    def __init__(self):
+        """Initializes an empty engine, slots are assigned as players are first seen."""
+        self.slots = {}
+        self.teams = array('b')
+        self.columns = {name : array('d') for name in PLAYER_COLUMNS}
+        self.team_columns = {name : array('d', [0.0] * len(TEAMS)) for name in TEAM_COLUMNS}
+        self.game_time = 0.0
+        self._team_of = {}
+        self._rows = []
+        self._sources = []
+        self._worth_times = []
+        self._worth_values = []
+
+    def _slot(self, player):
+        """Returns the slot of a player, assigning a new one if it was not seen before."""
+        slot = self.slots.get(player.summoner_name)
+        if slot is None:
+            slot = len(self._rows)
+            self.slots[player.summoner_name] = slot
+            self._team_of[player.summoner_name] = player.team
+            self.teams.append(TEAMS.index(player.team) if player.team in TEAMS else 0)
+            for column in self.columns.values():
+                column.append(0.0)
+            self._rows.append((0,) * len(PLAYER_COLUMNS))
+            self._sources.append(None)
+            self._worth_times.append(array('d'))
+            self._worth_values.append(array('d'))
+        return slot
+
+    def update(self, players, game_time : float):
+        """Applies a snapshot of `Player` objects taken at `game_time`, returns the number of players that changed."""
+        self.game_time = game_time
+        changed = 0
+        for player in players:
+            slot = self._slot(player)
+            if self._sources[slot] is player:
+                continue
+            self._sources[slot] = player
+            row = _player_row(player)
+            old = self._rows[slot]
+            if row == old:
+                continue
+            changed += 1
+            team = self.teams[slot]
+            for name, new_value, old_value in zip(PLAYER_COLUMNS, row, old):
+                if new_value != old_value:
+                    self.columns[name][slot] = new_value
+                    self.team_columns[name][team] += new_value - old_value
+            self._rows[slot] = row
+            if row[6] != old[6]:
+                self._worth_times[slot].append(game_time)
+                self._worth_values[slot].append(row[6])
+        return changed
+
+    def add_events(self, events):
+        """Applies a list of new event dicts, returns the number of objectives counted."""
+        counted = 0
+        for event in events:
+            column = OBJECTIVE_EVENTS.get(event['EventName'])
+            if column is None:
+                continue
+            team = credited_team(event, self._team_of)
+            if team not in TEAMS:
+                continue
+            self.team_columns[column][TEAMS.index(team)] += 1
+            counted += 1
+        return counted
+
+    def _worth_at(self, slot, game_time):
+        """Returns the net worth of a slot at `game_time`."""
+        index = bisect_right(self._worth_times[slot], game_time)
+        if index == 0:
+            return 0.0
+        return self._worth_values[slot][index - 1]
+
+    def gold_gained(self, player : str, window : float = 60.0):
+        """Gets the net worth a player gained in the last `window` seconds of game time."""
+        slot = self.slots[player]
+        return self.columns['item_value'][slot] - self._worth_at(slot, self.game_time - window)
+
+    def team_gold_gained(self, team : str, window : float = 60.0):
+        """Gets the net worth a team gained in the last `window` seconds of game time."""
+        team_index = TEAMS.index(team)
+        total = 0.0
+        for player, slot in self.slots.items():
+            if self.teams[slot] == team_index:
+                total += self.gold_gained(player, window)
+        return total
+
+    def gold_difference(self):
+        """Gets the item value of ORDER minus the item value of CHAOS."""
+        worth = self.team_columns['item_value']
+        return worth[0] - worth[1]
+
+    def cs_per_minute(self, player : str):
+        """Gets the creep score per minute of a player."""
+        if self.game_time <= 0:
+            return 0.0
+        return self.columns['creep_score'][self.slots[player]] / (self.game_time / 60)
+
+    def kda(self, player : str):
+        """Gets the (kills + assists) / deaths ratio of a player, deaths count as at least 1."""
+        slot = self.slots[player]
+        return (self.columns['kills'][slot] + self.columns['assists'][slot]) / max(self.columns['deaths'][slot], 1)
+
+    def team_totals(self, team : str):
+        """Gets a dict of every team column for the specified team."""
+        team_index = TEAMS.index(team)
+        return {name : column[team_index] for name, column in self.team_columns.items()}
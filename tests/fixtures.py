@@ -0,0 +1,137 @@
+"""Payloads and fakes of the Live Client and the LCU shared by the tests."""
+
+import json
+import threading
+from collections import namedtuple
+
+
+class FakeResponse:
+    """A Response holding `body` as json."""
+    def __init__(self, body):
+        self.ok = True
+        self.status_code = 200
+        self.content = json.dumps(body).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+ERROR_BODY = {'errorCode' : 'RESOURCE_NOT_FOUND', 'httpStatus' : 404, 'message' : 'Resource not found'}
+
+
+class FakeLiveClient:
+    """Answers like the Live Client from `state`, counting requests per endpoint."""
+    def __init__(self):
+        self.state = {
+            'playerlist' : playerlist(),
+            'activeplayer' : activeplayer(),
+            'eventdata' : {'Events' : [{'EventID' : 0, 'EventName' : 'GameStart', 'EventTime' : 0.0}]},
+            'gamestats' : {'gameMode' : 'CLASSIC', 'gameTime' : 60.0},
+        }
+        self.requests = []
+        #endpoint -> callable run before the body is read, to pause a request
+        self.hooks = {}
+
+    def get(self, url, verify = True):
+        endpoint = url.rsplit('/', 1)[1]
+        self.requests.append(endpoint)
+        hook = self.hooks.get(endpoint)
+        if hook is not None:
+            hook()
+        return FakeResponse(self.state[endpoint])
+
+
+class FakeSession:
+    """
+    Answers like the LCU: the current summoner, then `bodies` by endpoint and {} for the rest.
+
+    Requests other than the current summoner wait for `release`, which is already set
+    unless `hold` is True.
+    """
+    def __init__(self, bodies = None, hold = False):
+        self.bodies = bodies or {}
+        self.requests = []
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def request(self, method, url, data = None, verify = True):
+        endpoint = url[len('https://127.0.0.1:12345'):]
+        self.requests.append((method, endpoint))
+        if endpoint == '/lol-summoner/v1/current-summoner':
+            return FakeResponse({'summonerId' : 1})
+        self.release.wait(5)
+        return FakeResponse(self.bodies.get(endpoint, {}))
+
+
+def lcu_client(client_class, monkeypatch, session, **options):
+    """Creates a `Client` or `Async_Client` whose requests go to `session`."""
+    import Client_interface
+    monkeypatch.setattr(Client_interface, '_login', lambda scheduler: Client_interface._Transport(session, '12345', scheduler))
+    return client_class(**options)
+
+
+def item(item_ID, slot, count = 1, consumable = False, price = 300):
+    return {'canUse' : False, 'consumable' : consumable, 'count' : count, 'displayName' : 'Item %d' % item_ID,
+            'itemID' : item_ID, 'price' : price, 'rawDescription' : '', 'rawDisplayName' : '', 'slot' : slot}
+
+
+def player(name, team, items = (), creep_score = 0):
+    return {'championName' : 'Ahri', 'isBot' : False, 'isDead' : False, 'items' : list(items), 'level' : 1,
+            'position' : 'MIDDLE', 'rawChampionName' : '', 'respawnTimer' : 0.0, 'skinID' : 0,
+            'runes' : {'keystone' : {'displayName' : 'Electrocute', 'id' : 8112},
+                       'primaryRuneTree' : {'displayName' : 'Domination', 'id' : 8100},
+                       'secondaryRuneTree' : {'displayName' : 'Sorcery', 'id' : 8200}},
+            'scores' : {'assists' : 0, 'creepScore' : creep_score, 'deaths' : 0, 'kills' : 0, 'wardScore' : 0.0},
+            'summonerName' : name,
+            'summonerSpells' : {'summonerSpellOne' : {'displayName' : 'Flash', 'rawDisplayName' : 'GeneratedTip_SummonerSpell_SummonerFlash_DisplayName'},
+                                'summonerSpellTwo' : {'displayName' : 'Ignite', 'rawDisplayName' : 'GeneratedTip_SummonerSpell_SummonerDot_DisplayName'}},
+            'team' : team}
+
+
+def playerlist():
+    return [player('P%d' % index, 'ORDER' if index < 5 else 'CHAOS') for index in range(10)]
+
+
+def activeplayer(name = 'P0', gold = 500.0):
+    return {'abilities' : {}, 'championStats' : {}, 'currentGold' : gold,
+            'fullRunes' : {'generalRunes' : [], 'statRunes' : []}, 'level' : 1, 'summonerName' : name}
+
+
+def champ_select(action_type = 'pick', position = 'middle', my_champion = 0, spells = (4, 14), team_bans = (), completed = (), game_ID = 1):
+    """A champ select session where the local player (cell 0) has an action in progress, and cell 1 hovers Lux (99)."""
+    actions = [[{'actorCellId' : 5, 'championId' : champ, 'completed' : True, 'id' : index, 'isInProgress' : False, 'type' : 'pick'}
+                for index, champ in enumerate(completed)]]
+    actions.append([{'actorCellId' : 0, 'championId' : 0, 'completed' : False, 'id' : 10, 'isInProgress' : True, 'type' : action_type}])
+    return {'actions' : actions, 'bans' : {'myTeamBans' : list(team_bans), 'theirTeamBans' : []}, 'gameId' : game_ID, 'localPlayerCellId' : 0,
+            'myTeam' : [{'assignedPosition' : position, 'cellId' : 0, 'championId' : my_champion, 'championPickIntent' : 0,
+                         'spell1Id' : spells[0], 'spell2Id' : spells[1], 'summonerId' : 1},
+                        {'assignedPosition' : 'top', 'cellId' : 1, 'championId' : 0, 'championPickIntent' : 99,
+                         'spell1Id' : 4, 'spell2Id' : 12, 'summonerId' : 2}],
+            'theirTeam' : [{'cellId' : 5, 'championId' : 0}]}
+
+
+#the attributes of an `ActiveGame` that `export.SessionRecorder` reads
+RecordedState = namedtuple('RecordedState', ['event_list', 'game_time', 'raw_players', 'raw_active_player'])
+
+
+def record_session(path, killers):
+    """
+    Records a session of two snapshots to `path` and returns it.
+
+    P0 holds a Doran's Blade and two potions. Every name in `killers` kills a dragon and then P1,
+    and the second snapshot is taken at 900 seconds with 1200 gold on the active player.
+    """
+    from export import SessionRecorder
+    raw = playerlist()
+    raw[0] = player('P0', 'ORDER', items = [item(1055, 0, price = 450), item(2003, 1, count = 2, consumable = True, price = 50)])
+    events = [{'EventID' : 0, 'EventName' : 'GameStart', 'EventTime' : 0.0}]
+    with SessionRecorder(str(path)) as recorder:
+        recorder.record(RecordedState(tuple(events), 30.0, raw, activeplayer()))
+        for killer in killers:
+            events.append({'EventID' : len(events), 'EventName' : 'DragonKill', 'EventTime' : 300.0 * len(events),
+                           'KillerName' : killer, 'DragonType' : 'Fire'})
+            events.append({'EventID' : len(events), 'EventName' : 'ChampionKill', 'EventTime' : 300.0 * len(events),
+                           'KillerName' : killer, 'VictimName' : 'P1'})
+        recorder.record(RecordedState(tuple(events), 900.0, raw, activeplayer(gold = 1200.0)))
+    return path
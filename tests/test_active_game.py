@@ -0,0 +1,204 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import active
+from fixtures import ERROR_BODY, FakeLiveClient, activeplayer, item, player, playerlist
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeLiveClient()
+    monkeypatch.setattr(active, '_live_session', lambda: fake)
+    return fake
+
+
+@pytest.mark.parametrize('endpoint, update', [
+    ('eventdata', lambda game: game.updateEventList()),
+    ('gamestats', lambda game: game.updateGameStats()),
+    ('playerlist', lambda game: game.loadPlayerList()),
+])
+def test_error_payloads_raise_request_error(client, endpoint, update):
+    game = active.ActiveGame()
+    client.state[endpoint] = ERROR_BODY
+    with pytest.raises(active.RequestError):
+        update(game)
+
+
+@pytest.mark.parametrize('endpoint, update', [
+    ('eventdata', lambda game: game.update_events()),
+    ('gamestats', lambda game: game.update_game_stats()),
+    ('playerlist', lambda game: game.load_players()),
+    ('eventdata', lambda game: game.refresh()),
+])
+def test_async_error_payloads_raise_request_error(client, endpoint, update):
+    game = asyncio.run(active.AsyncActiveGame.create())
+    client.state[endpoint] = ERROR_BODY
+    with pytest.raises(active.RequestError):
+        asyncio.run(update(game))
+
+
+def test_unchanged_payloads_are_not_rebuilt(client):
+    game = active.ActiveGame()
+    players = game.players
+    assert game.updateEventList() == []
+    game.loadPlayerList()
+    game.loadPlayerList()
+
+    assert game.players is players
+    stats = game.getFetchStats()
+    assert stats['playerlist'] == {'fetches' : 3, 'unchanged' : 2, 'unchanged_ratio' : 2 / 3}
+    assert stats['eventdata']['unchanged'] == 1
+
+
+def test_active_player_change_keeps_other_players(client):
+    game = active.ActiveGame()
+    players = game.players
+    client.state['activeplayer'] = dict(client.state['activeplayer'], currentGold = 750.0)
+    game.loadPlayerList()
+
+    assert game.active_player is not players[0]
+    assert game.active_player.gold == 750.0
+    assert game.players[0] is game.active_player
+    assert all(new is old for new, old in zip(game.players[1:], players[1:]))
+
+
+def test_playerlist_change_rebuilds_players(client):
+    game = active.ActiveGame()
+    players = game.players
+    client.state['playerlist'][3] = player('P3', 'ORDER', creep_score = 12)
+    game.loadPlayerList()
+
+    assert game.players[3].scores['creepScore'] == 12
+    assert all(new is not old for new, old in zip(game.players, players))
+
+
+def test_changed_events_are_applied(client):
+    game = active.ActiveGame()
+    kill = {'EventID' : 1, 'EventName' : 'ChampionKill', 'EventTime' : 70.0, 'KillerName' : 'P1', 'VictimName' : 'P6', 'Assisters' : []}
+    client.state['eventdata'] = {'Events' : client.state['eventdata']['Events'] + [kill]}
+
+    assert game.updateEventList() == [kill]
+    assert game.getLastEvent() == kill
+
+
+def test_repeated_error_payload_is_not_skipped(client):
+    game = active.ActiveGame()
+    client.state['eventdata'] = ERROR_BODY
+    for _ in range(2):
+        with pytest.raises(active.RequestError):
+            game.updateEventList()
+
+
+def test_player_updates_are_timed_by_the_current_game_time(client):
+    game = active.ActiveGame()
+    client.state['gamestats'] = {'gameMode' : 'CLASSIC', 'gameTime' : 95.0}
+    client.state['playerlist'][3] = player('P3', 'ORDER', items = [item(1055, 0, price = 450)])
+    game.loadPlayerList()
+    assert game.game_time == 95.0
+    assert game.inventory.transactions('P3')[0].game_time == 95.0
+    assert game.stats.gold_gained('P3', 10.0) == 450
+
+
+def test_game_time_is_fetched_once_per_poll(client):
+    game = active.ActiveGame()
+    client.requests.clear()
+    for _ in range(3):
+        game.updateGameStats()
+        game.loadPlayerList(update_game_time = False)
+        game.updateEventList()
+    assert client.requests.count('gamestats') == 3
+    assert client.requests.count('playerlist') == 3
+    asynchronous = active.AsyncActiveGame()
+    client.requests.clear()
+    asyncio.run(asynchronous.load_players(update_game_time = False))
+    assert client.requests == ['playerlist', 'activeplayer']
+    asyncio.run(asynchronous.load_players())
+    assert sorted(client.requests[2:]) == ['activeplayer', 'gamestats', 'playerlist']
+
+
+def test_unchanged_playerlist_does_not_bring_back_an_older_roster(client):
+    game = active.ActiveGame()
+    arrived, release = threading.Event(), threading.Event()
+
+    def pause():
+        if threading.current_thread().name == 'slow':
+            arrived.set()
+            release.wait(5)
+
+    #the slow update sees playerlist unchanged, then waits on activeplayer
+    client.hooks['activeplayer'] = pause
+    client.state['activeplayer'] = activeplayer(gold = 900.0)
+    slow = threading.Thread(target = game.loadPlayerList, name = 'slow')
+    slow.start()
+    assert arrived.wait(5)
+    #meanwhile another update applies a new playerlist
+    client.state['playerlist'] = client.state['playerlist'][:3] + [player('P3', 'ORDER', items = [item(1055, 0)])] + client.state['playerlist'][4:]
+    game.loadPlayerList()
+    client.state['activeplayer'] = activeplayer(gold = 1000.0)
+    release.set()
+    slow.join(5)
+
+    assert game.raw_players[3]['items']
+    assert game.players[3].items[0].item_ID == 1055
+    assert game.active_player.gold == 1000.0
+    game.loadPlayerList()
+    assert game.players[3].items[0].item_ID == 1055
+    #the inventory never saw the item disappear again
+    assert [transaction.kind for transaction in game.inventory.transactions('P3')] == ['purchase']
+
+
+def test_concurrent_updates_and_readers(client):
+    game = active.ActiveGame()
+    stop = threading.Event()
+    errors = []
+
+    def change():
+        for step in range(1, 200):
+            players = list(client.state['playerlist'])
+            players[step % 10] = player('P%d' % (step % 10), 'ORDER' if step % 10 < 5 else 'CHAOS', creep_score = step)
+            client.state['playerlist'] = players
+            client.state['activeplayer'] = activeplayer(gold = 500.0 + step)
+            events = client.state['eventdata']['Events']
+            client.state['eventdata'] = {'Events' : events + [{'EventID' : step, 'EventName' : 'MinionsSpawning', 'EventTime' : float(step)}]}
+        stop.set()
+
+    def update(method):
+        try:
+            while not stop.is_set():
+                method()
+        except Exception as error:
+            errors.append(error)
+
+    def read():
+        try:
+            while not stop.is_set():
+                snapshot = game.snapshot()
+                assert [user.summoner_name for user in snapshot.players] == [user['summonerName'] for user in snapshot.raw_players]
+                assert [user.scores for user in snapshot.players] == [user['scores'] for user in snapshot.raw_players]
+                assert snapshot.active_player in snapshot.players
+                assert snapshot.active_player.gold == snapshot.raw_active_player['currentGold']
+                assert [event['EventID'] for event in snapshot.events] == list(range(len(snapshot.events)))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target = update, args = (method,)) for method in (game.loadPlayerList, game.loadPlayerList, game.updateEventList, game.updateEventList)]
+    threads += [threading.Thread(target = read) for _ in range(2)]
+    threads.append(threading.Thread(target = change))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert errors == []
+
+    game.loadPlayerList()
+    game.updateEventList()
+    assert game.raw_players == client.state['playerlist']
+    assert [user.scores['creepScore'] for user in game.players] == [user['scores']['creepScore'] for user in client.state['playerlist']]
+    assert game.active_player.gold == 699.0
+    assert len(game.event_list) == 200
+    assert game.events.last_id == 199
@@ -0,0 +1,118 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autopilot import ANY_POSITION, AutoPilot, ChampSelectPlan, Loadout
+from fixtures import champ_select
+
+#Ahri, Lux, Zed, Annie
+AHRI, LUX, ZED, ANNIE = 103, 99, 238, 1
+
+RUNES = {'name' : 'Ahri', 'primary_tree' : 8100, 'perks' : [8112, 8139, 8138, 8135, 8226, 8210, 5008, 5008, 5002], 'secondary_tree' : 8200}
+
+
+class FakeClient:
+    """Serves one champ select session and applies the writes to it."""
+    def __init__(self, session, pickable = (AHRI, LUX, ZED, ANNIE)):
+        self.session = session
+        self.pickable = list(pickable)
+        self.calls = []
+
+    def get_champ_select(self):
+        self.calls.append(('get_champ_select',))
+        return self.session
+
+    def get_pickable_champions(self):
+        self.calls.append(('get_pickable_champions',))
+        return self.pickable
+
+    def complete_action(self, action_id, champ):
+        self.calls.append(('complete_action', action_id, champ))
+        self.session['actions'][-1][0].update(championId = champ, completed = True, isInProgress = False)
+        self.session['myTeam'][0]['championId'] = champ
+
+    def change_summoners(self, spell_1, spell_2):
+        self.calls.append(('change_summoners', spell_1, spell_2))
+        self.session['myTeam'][0].update(spell1Id = spell_1, spell2Id = spell_2)
+
+    def change_current_page(self, **runes):
+        self.calls.append(('change_current_page', runes['name']))
+
+    def writes(self):
+        return [call for call in self.calls if call[0] not in ('get_champ_select', 'get_pickable_champions')]
+
+
+def plan():
+    return ChampSelectPlan(bans = ['Zed', 'Annie'], picks = {'middle' : ['Lux', 'Ahri'], ANY_POSITION : ['Annie']},
+                           loadouts = {'Ahri' : Loadout(spells = ('Flash', 'Ignite'), runes = RUNES),
+                                       'Annie' : Loadout(spells = (4, 12))})
+
+
+def test_names_are_resolved_once():
+    resolved = plan()
+    assert resolved.bans == (ZED, ANNIE)
+    assert resolved.pick_order('MIDDLE') == (LUX, AHRI, ANNIE)
+    assert resolved.pick_order('jungle') == (ANNIE,)
+    assert resolved.loadouts[AHRI].spells == (4, 14)
+
+
+def test_ban_skips_banned_champions():
+    pilot = AutoPilot(None, plan())
+    assert pilot.decide(champ_select('ban')) == [('complete', 10, ZED)]
+    assert pilot.decide(champ_select('ban', team_bans = [ZED])) == [('complete', 10, ANNIE)]
+    assert pilot.decide(champ_select('ban', team_bans = [ZED, ANNIE])) == []
+
+
+def test_pick_falls_back_to_the_pickable_set():
+    pilot = AutoPilot(None, plan())
+    #Lux is hovered by a teammate, so Ahri is picked with her loadout
+    assert pilot.decide(champ_select(), {AHRI, LUX, ANNIE}) == [('complete', 10, AHRI), ('runes', AHRI)]
+    #Ahri is not owned, the ANY_POSITION pick is used
+    assert pilot.decide(champ_select(), {LUX, ANNIE}) == [('complete', 10, ANNIE), ('spells', 4, 12)]
+    #taken by the enemy team
+    assert pilot.decide(champ_select(completed = [AHRI]), {AHRI, LUX, ANNIE}) == [('complete', 10, ANNIE), ('spells', 4, 12)]
+    assert pilot.decide(champ_select(), set()) == []
+
+
+def test_own_hover_is_not_taken():
+    pilot = AutoPilot(None, plan())
+    session = champ_select(my_champion = AHRI)
+    session['myTeam'][0]['championPickIntent'] = AHRI
+    assert pilot.decide(session, {AHRI, ANNIE}) == [('complete', 10, AHRI), ('runes', AHRI)]
+
+
+def test_a_new_champ_select_writes_the_runes_again():
+    client = FakeClient(champ_select(), pickable = (AHRI,))
+    pilot = AutoPilot(client, plan())
+    assert pilot.step() == [('complete', 10, AHRI), ('runes', AHRI)]
+    client.session = champ_select(game_ID = 2)
+    client.pickable = [AHRI, ANNIE]
+    assert pilot.step() == [('complete', 10, AHRI), ('runes', AHRI)]
+    assert client.calls.count(('get_pickable_champions',)) == 2
+    assert client.writes().count(('change_current_page', 'Ahri')) == 2
+
+
+def test_steps_do_not_repeat_writes():
+    client = FakeClient(champ_select(spells = (4, 12)), pickable = (AHRI, ANNIE))
+    pilot = AutoPilot(client, plan())
+    assert pilot.step() == [('complete', 10, AHRI), ('spells', 4, 14), ('runes', AHRI)]
+    assert pilot.step() == []
+    assert client.writes() == [('complete_action', 10, AHRI), ('change_summoners', 4, 14), ('change_current_page', 'Ahri')]
+    assert client.calls.count(('get_pickable_champions',)) == 1
+
+
+def test_run_reads_the_session_once_per_step(monkeypatch):
+    client = FakeClient(champ_select(), pickable = (AHRI,))
+    pilot = AutoPilot(client, plan())
+    steps = []
+
+    def sleep(interval):
+        steps.append(interval)
+        if len(steps) == 3:
+            client.session = {'errorCode' : 'RPC_ERROR', 'httpStatus' : 404}
+
+    monkeypatch.setattr('autopilot.time.sleep', sleep)
+    pilot.run(0.25)
+    assert steps == [0.25] * 3
+    assert client.calls.count(('get_champ_select',)) == 4
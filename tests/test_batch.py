@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+from batch import EventCountReducer, ExportReducer, Reducer, analyze_sessions, load_game, shard
+from fixtures import record_session
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Eight recorded sessions, the later ones with more kills."""
+    return [record_session(tmp_path / ('game%d.jsonl' % index), ['P0', 'P5'] * index) for index in range(8)]
+
+
+def test_shards_hold_about_the_same_number_of_bytes(tmp_path):
+    paths = []
+    for index, size in enumerate([100, 100, 100, 100, 400, 100, 100, 1000]):
+        path = tmp_path / ('%d.jsonl' % index)
+        path.write_bytes(b'x' * size)
+        paths.append(str(path))
+    #shards end where the running total is nearest to a multiple of a third of the bytes
+    shards = shard(paths, 3)
+    assert [path for part in shards for path in part] == paths
+    assert [[os.path.getsize(path) for path in part] for part in shards] == [[100, 100, 100, 100, 400], [100, 100], [1000]]
+    assert shard(paths, 1) == [paths]
+    assert shard(paths[:1], 4) == [paths[:1]]
+    assert shard([], 4) == []
+    assert len(shard(paths, 20)) <= len(paths)
+
+
+def test_load_game_replays_every_snapshot(sessions, tmp_path):
+    game = load_game(sessions[2])
+    assert game.game_id == str(sessions[2])
+    assert game.game_time == 900.0
+    assert [event['EventName'] for event in game.event_list] == ['GameStart'] + ['DragonKill', 'ChampionKill'] * 4
+    assert game.stats.team_totals('ORDER')['dragons'] == 2
+    assert game.stats.team_totals('CHAOS')['dragons'] == 2
+    assert game.players[0].gold == 1200.0
+    #both snapshots hold the same items, bought before the first one
+    assert [transaction.game_time for transaction in game.inventory.transactions('P0')] == [30.0, 30.0]
+    empty = tmp_path / 'empty.jsonl'
+    empty.write_text('', encoding = 'utf-8')
+    assert load_game(empty) is None
+
+
+def test_worker_counts_give_the_same_result(sessions):
+    reducers = {'counts' : EventCountReducer(), 'tables' : ExportReducer()}
+    single = analyze_sessions(sessions, reducers, workers = 1)
+    pooled = analyze_sessions(sessions, reducers, workers = 3, shards_per_worker = 2)
+    assert single['counts'] == pooled['counts'] == {'GameStart' : 8, 'DragonKill' : 56, 'ChampionKill' : 56}
+    for name in ('players', 'items', 'events'):
+        assert single['tables'][name].to_pydict() == pooled['tables'][name].to_pydict()
+    assert single['tables']['players'].num_rows == 80
+    assert single['tables']['events'].value_counts('game_id')[str(sessions[7])] == 29
+
+
+def test_reducers_must_implement_add_and_merge():
+    class Partial(Reducer):
+        def add(self, partial, game):
+            return partial
+
+    with pytest.raises(TypeError):
+        Partial()
+    assert isinstance(EventCountReducer(), batch.Reducer)
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import EventStore, involved_players
+
+
+def event(event_ID, name, time, **fields):
+    return dict({'EventID' : event_ID, 'EventName' : name, 'EventTime' : time}, **fields)
+
+
+def match():
+    """A game's eventdata payload: kills of P1 by P0 and P5 alternating, with a dragon every 4 events."""
+    events = [event(0, 'GameStart', 0.0)]
+    for index in range(1, 20):
+        if index % 4 == 0:
+            events.append(event(index, 'DragonKill', 60.0 * index, KillerName = 'P5', Assisters = ['P6']))
+        else:
+            killer = 'P0' if index % 2 else 'P5'
+            events.append(event(index, 'ChampionKill', 60.0 * index, KillerName = killer, VictimName = 'P1', Assisters = ['P2']))
+    return events
+
+
+def test_involved_players():
+    assert involved_players(event(1, 'ChampionKill', 1.0, KillerName = 'P0', VictimName = 'P1', Assisters = ['P2'])) == {'P0', 'P1', 'P2'}
+    assert involved_players(event(2, 'Ace', 2.0, Acer = 'P0', AcingTeam = 'ORDER')) == {'P0'}
+    assert involved_players(event(3, 'TurretKilled', 3.0, KillerName = '', Assisters = [])) == set()
+
+
+def test_repeated_full_payloads_only_add_new_events():
+    store = EventStore()
+    events = match()
+    assert store.add(events[:5]) == events[:5]
+    assert store.last_id == 4
+    #the Live Client always returns every event of the game
+    assert store.add(events[:5]) == []
+    assert store.add(events[:8]) == events[5:8]
+    assert store.add(events) == events[8:]
+    assert store.add(events) == []
+    assert len(store) == 20
+    assert store.last(2) == events[-2:]
+    assert len(store.query(event_name = 'ChampionKill')) == 15
+
+
+def test_ring_evicts_the_oldest_events_to_the_spill_file(tmp_path):
+    spill = tmp_path / 'spill.jsonl'
+    store = EventStore(capacity = 5, spill_path = str(spill))
+    events = match()
+    store.add(events[:3])
+    assert list(store.spilled()) == []
+    store.add(events)
+    assert len(store) == 5
+    assert store.last(5) == events[-5:]
+    assert list(store.spilled()) == events[:-5]
+    assert [json.loads(line)['EventID'] for line in spill.read_text(encoding = 'utf-8').splitlines()] == list(range(15))
+    #evicted events are gone from every index
+    assert store.between() == events[-5:]
+    assert store.by_type('GameStart') == []
+    assert store.by_type('DragonKill') == [events[16]]
+    assert store.involving('P0') == [events[15], events[17], events[19]]
+
+
+def test_evicted_events_are_dropped_without_a_spill_path():
+    store = EventStore(capacity = 3)
+    store.add(match())
+    assert len(store) == 3
+    assert list(store.spilled()) == []
+    assert store.query(since = 0.0) == match()[-3:]
+
+
+def test_queries_combine_type_player_and_time():
+    store = EventStore()
+    events = match()
+    store.add(events)
+    assert store.query(event_name = 'DragonKill') == [events[index] for index in (4, 8, 12, 16)]
+    assert store.query(event_name = 'DragonKill', player = 'P6', since = 500.0, until = 960.0) == [events[12], events[16]]
+    assert store.query(event_name = 'ChampionKill', player = 'P0', until = 300.0) == [events[1], events[3], events[5]]
+    assert store.query(player = 'P1', since = 1020.0) == [events[17], events[18], events[19]]
+    assert store.query(event_name = 'ChampionKill', player = 'P6') == []
+    assert store.query(event_name = 'BaronKill') == []
+    assert store.query(player = 'P9') == []
+    assert store.between(120.0, 180.0) == events[2:4]
+    assert store.by_type('ChampionKill', since = 1080.0) == events[18:]
+    assert store.involving('P2', until = 60.0) == [events[1]]
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
+from export import EVENT_SCHEMA, Table, export_sessions
+from fixtures import record_session
+
+
+def _without_numpy():
+    return None
+
+
+@pytest.fixture(params = ['python', 'numpy'])
+def backend(request, monkeypatch):
+    """Runs a test with the numpy code paths, when numpy is installed, and with the Python fallback."""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(export, '_numpy', _without_numpy)
+    return request.param
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Two recorded sessions: ORDER kills a dragon in the first, CHAOS kills two in the second."""
+    return [record_session(tmp_path / ('game%d.jsonl' % index), killers) for index, killers in enumerate((['P0'], ['P5', 'P6']))]
+
+
+def test_table_extend_where_and_take(backend):
+    table = Table(EVENT_SCHEMA)
+    table.extend([('g', 0, 'GameStart', 0.0, '', '', ''),
+                  ('g', 1, 'DragonKill', 300.0, 'P0', '', 'ORDER'),
+                  ('g', 2, 'DragonKill', 600.0, 'P5', '', 'CHAOS')])
+    table.extend([])
+    assert len(table) == 3
+    assert table.where(event_name = 'DragonKill').to_pydict()['event_id'] == [1, 2]
+    assert table.where(event_name = 'DragonKill', team = 'CHAOS').to_pydict()['event_time'] == [600.0]
+    assert table.where(event_name = 'BaronKill').num_rows == 0
+    assert table.where(event_id = 0).to_pydict()['event_name'] == ['GameStart']
+    assert table.where() is table
+
+
+def test_append_and_concat_map_string_codes():
+    first, second = Table(EVENT_SCHEMA), Table(EVENT_SCHEMA)
+    first.extend([('a', 0, 'GameStart', 0.0, '', '', '')])
+    second.extend([('b', 0, 'DragonKill', 1.0, 'P0', '', 'ORDER'), ('b', 1, 'GameStart', 2.0, '', '', '')])
+    table = Table.concat([first, second])
+    assert table.to_pydict()['event_name'] == ['GameStart', 'DragonKill', 'GameStart']
+    assert table.columns['event_name'].categories == ['GameStart', 'DragonKill']
+    assert first.num_rows == 1
+
+
+def test_export_sessions(backend, sessions):
+    tables = export_sessions(sessions)
+    players, items, events = tables['players'], tables['items'], tables['events']
+    assert players.num_rows == 20
+    assert items.num_rows == 4
+    assert events.num_rows == 8
+    dragons = events.where(event_name = 'DragonKill')
+    assert dragons.to_pydict()['killer_name'] == ['P0', 'P5', 'P6']
+    assert dragons.value_counts('team') == {'ORDER' : 1, 'CHAOS' : 2}
+    assert events.value_counts('event_name') == {'GameStart' : 2, 'DragonKill' : 3, 'ChampionKill' : 3}
+    assert players.value_counts('team') == {'ORDER' : 10, 'CHAOS' : 10}
+    host = players.where(summoner_name = 'P0', game_id = str(sessions[1])).to_pydict()
+    assert host['gold'] == [1200.0]
+    assert host['item_value'] == [550]
+    assert host['game_time'] == [900.0]
+    assert items.where(consumable = True).to_pydict()['count'] == [2, 2]
+
+
+def test_session_files_keep_only_new_events(sessions):
+    snapshots = list(export.read_session(sessions[1]))
+    assert [len(snapshot['events']) for snapshot in snapshots] == [1, 4]
+
+
+def test_to_numpy_requires_numpy(monkeypatch):
+    monkeypatch.setattr(export, '_numpy', _without_numpy)
+    with pytest.raises(ImportError):
+        Table(EVENT_SCHEMA).to_numpy()
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gamedata
+from fixtures import FakeResponse
+from gamedata import GameData, UnknownGameDataError
+
+
+@pytest.fixture
+def bundled(tmp_path):
+    return GameData(cache_path = str(tmp_path / 'missing.json'))
+
+
+@pytest.mark.parametrize('category, id, name', [
+    ('champions', 103, 'Ahri'),
+    ('spells', 4, 'Flash'),
+    ('runes', 8100, 'Domination'),
+    ('runes', 8112, 'Electrocute'),
+    ('runes', 8139, 'Taste of Blood'),
+    ('runes', 8473, 'Bone Plating'),
+    ('runes', 5008, 'Adaptive Force'),
+])
+def test_bundled_lookups_in_both_directions(monkeypatch, bundled, category, id, name):
+    monkeypatch.setattr(gamedata, '_default', bundled)
+    assert bundled.version == 'bundled'
+    assert bundled.name(category, id) == name
+    assert bundled.id(category, name.upper()) == id
+    assert gamedata.resolve(category, name) == id
+    assert gamedata.resolve(category, id) == id
+
+
+def test_every_rune_slot_is_bundled(bundled):
+    perks = [8112, 8139, 8140, 8135, 8226, 8210, 5008, 5008, 5011]
+    assert [bundled.rune_name(perk) for perk in perks] == ['Electrocute', 'Taste of Blood', 'Grisly Mementos', 'Treasure Hunter',
+                                                            'Manaflow Band', 'Transcendence', 'Adaptive Force', 'Adaptive Force', 'Health']
+
+
+def test_unknown_entries_raise(bundled):
+    with pytest.raises(UnknownGameDataError) as error:
+        bundled.champion_id('Not a champion')
+    assert error.value.msg == 'Unknown champions name Not a champion'
+    with pytest.raises(UnknownGameDataError):
+        bundled.spell_name(99999)
+
+
+def test_items_ask_for_a_refresh(bundled):
+    with pytest.raises(UnknownGameDataError) as error:
+        bundled.item_name(1055)
+    assert 'refresh' in error.value.msg
+    with pytest.raises(UnknownGameDataError) as error:
+        bundled.item_id("Doran's Blade")
+    assert 'refresh' in error.value.msg
+
+
+class FakeClient:
+    ASSETS = {
+        '/lol-patch/v1/game-version' : '14.20.1',
+        '/lol-game-data/assets/v1/items.json' : [{'id' : 1055, 'name' : "Doran's Blade"}],
+        '/lol-game-data/assets/v1/perks.json' : [{'id' : 8112, 'name' : 'Electrocute'}],
+        '/lol-game-data/assets/v1/champion-summary.json' : [{'id' : -1, 'name' : 'None'}, {'id' : 103, 'name' : 'Ahri'}],
+        '/lol-game-data/assets/v1/summoner-spells.json' : [{'id' : 4, 'name' : 'Flash'}],
+        '/lol-game-data/assets/v1/perkstyles.json' : {'styles' : [{'id' : 8100, 'name' : 'Domination'}]},
+    }
+
+    def __init__(self):
+        self.requests = 0
+
+    def get_req(self, endpoint):
+        self.requests += 1
+        return FakeResponse(self.ASSETS[endpoint])
+
+
+def test_refresh_downloads_items_and_caches_them(tmp_path):
+    cache = tmp_path / 'gamedata.json'
+    data = GameData(cache_path = str(cache))
+    client = FakeClient()
+    assert data.refresh(client)
+    assert data.version == '14.20.1'
+    assert data.item_id("doran's blade") == 1055
+    assert data.item_name(1055) == "Doran's Blade"
+    assert data.rune_name(8100) == 'Domination'
+    #the same patch is not downloaded again
+    requests = client.requests
+    assert not data.refresh(client)
+    assert client.requests == requests + 1
+    #a new store reads the cache instead of the bundled snapshot
+    assert json.loads(cache.read_text(encoding = 'utf-8'))['version'] == '14.20.1'
+    assert GameData(cache_path = str(cache)).item_name(1055) == "Doran's Blade"
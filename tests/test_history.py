@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from active import ActivePlayer, GameSnapshot, Player
+from fixtures import activeplayer, item, player, playerlist
+from history import SnapshotHistory
+
+
+def snapshot(raw_players, raw_active, game_time, events = ()):
+    players = tuple(ActivePlayer(user, raw_active) if user['summonerName'] == raw_active['summonerName'] else Player(user)
+                    for user in raw_players)
+    return GameSnapshot(players, players[0], tuple(events), game_time, raw_players, raw_active)
+
+
+def attributes(players):
+    return [dict(vars(player)) for player in players]
+
+
+def test_record_does_not_change_its_input_and_shares_unchanged_parts():
+    raw = playerlist()
+    raw[1] = player('P1', 'ORDER', items = [item(1055, 0), item(2003, 1, consumable = True)])
+    first = snapshot(raw, activeplayer(), 60.0)
+    raw = list(raw)
+    raw[1] = player('P1', 'ORDER', items = [item(1055, 0), item(2003, 1, consumable = True)], creep_score = 8)
+    second = snapshot(raw, activeplayer(), 61.0)
+    before = [attributes(first.players), attributes(second.players)]
+
+    history = SnapshotHistory()
+    assert history.record(first)
+    assert history.record(second)
+
+    assert [attributes(first.players), attributes(second.players)] == before
+    old, new = history.state_at(60.5), history.state_at(61.0)
+    #unchanged players are the same objects
+    assert all(new.players[index] is old.players[index] for index in range(10) if index != 1)
+    #the changed player shares everything but its scores, and is not the recorded input
+    assert new.players[1] is not second.players[1]
+    assert new.players[1].items is old.players[1].items
+    assert new.players[1].runes is old.players[1].runes
+    assert new.players[1].scores == {'assists' : 0, 'creepScore' : 8, 'deaths' : 0, 'kills' : 0, 'wardScore' : 0.0}
+
+
+def test_unchanged_snapshots_are_not_stored():
+    raw_players, raw_active = playerlist(), activeplayer()
+    history = SnapshotHistory()
+    assert history.record(snapshot(raw_players, raw_active, 60.0))
+    assert not history.record(snapshot(raw_players, raw_active, 61.0))
+    assert len(history) == 1
+
+
+def test_time_travel_queries():
+    raw_players = playerlist()
+    events = [{'EventID' : 0, 'EventName' : 'GameStart', 'EventTime' : 0.0}]
+    history = SnapshotHistory()
+    for second in range(5):
+        events.append({'EventID' : second + 1, 'EventName' : 'MinionsSpawning', 'EventTime' : float(second)})
+        history.record(snapshot(raw_players, activeplayer(gold = 500.0 + second), float(second), events))
+
+    assert history.state_at(-1.0) is None
+    assert history.state_at(2.5).game_time == 2.0
+    assert history.state_at(2.5).active_player.gold == 502.0
+    assert len(history.state_at(2.5).events) == 4
+    assert [state.game_time for state in history.range(1.0, 3.0)] == [1.0, 2.0, 3.0]
+
+
+def test_snapshot_events_are_views_of_the_recorded_events():
+    raw_players = playerlist()
+    events = [{'EventID' : number, 'EventName' : 'MinionsSpawning', 'EventTime' : float(number)} for number in range(6)]
+    history = SnapshotHistory()
+    for second in range(6):
+        history.record(snapshot(raw_players, activeplayer(gold = 500.0 + second), float(second), events[:second + 1]))
+
+    old = history.state_at(2.0).events
+    assert len(old) == 3 and old == tuple(events[:3]) and list(old) == events[:3]
+    assert old[0] is events[0] and old[-1] is events[2]
+    assert old[1:] == (events[1], events[2]) and old[::-2] == (events[2], events[0])
+    assert events[3] not in old
+    with pytest.raises(IndexError):
+        old[3]
+    #recording more events does not change the views already returned
+    history.record(snapshot(raw_players, activeplayer(gold = 600.0), 7.0, events + [{'EventID' : 6, 'EventName' : 'GameEnd', 'EventTime' : 7.0}]))
+    assert len(old) == 3
+    assert len(history.latest().events) == 7
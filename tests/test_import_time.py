@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#cumulative microseconds allowed for importing both modules, as reported by -X importtime;
+#importing requests alone used to take about 80ms
+IMPORT_BUDGET_US = 40000
+
+HEAVY_MODULES = ('requests', 'urllib3', 'asyncio', 'subprocess', 'pprint')
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], cwd = ROOT, capture_output = True, text = True, check = True)
+
+
+def test_import_time_within_budget():
+    best = None
+    #the best of a few runs, so a busy machine does not fail the test
+    for _ in range(3):
+        stderr = run_python('-X', 'importtime', '-c', 'import Client_interface, active').stderr
+        total = 0
+        for line in stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] in ('Client_interface', 'active'):
+                total += int(fields[1])
+        best = total if best is None else min(best, total)
+    assert 0 < best <= IMPORT_BUDGET_US
+
+
+def test_import_loads_no_heavy_modules():
+    code = 'import sys, Client_interface, active; print(" ".join(m for m in %r if m in sys.modules))' % (HEAVY_MODULES,)
+    assert run_python('-c', code).stdout.strip() == ''
+
+
+def test_import_has_no_global_side_effects():
+    code = 'import warnings; before = list(warnings.filters); import Client_interface, active; print(before == warnings.filters)'
+    assert run_python('-c', code).stdout.strip() == 'True'
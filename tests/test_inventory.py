@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from active import Player
+from fixtures import item, player
+from inventory import InventoryTimeline, Transaction
+
+LONG_SWORD, SERRATED_DIRK, HEALTH_POTION, WARDING_TOTEM = 1036, 3134, 2003, 3340
+
+
+def players(*items):
+    return [Player(player('P0', 'ORDER', items = items)), Player(player('P5', 'CHAOS', items = [item(WARDING_TOTEM, 6)]))]
+
+
+def test_components_are_combined_and_potions_consumed():
+    timeline = InventoryTimeline()
+    timeline.update(players(), 0.0)
+    added = timeline.update(players(item(LONG_SWORD, 0), item(HEALTH_POTION, 1, count = 3, consumable = True)), 60.0)
+    assert ('P0', Transaction(60.0, 'purchase', LONG_SWORD, 0, 1)) in added
+    timeline.update(players(item(LONG_SWORD, 0), item(HEALTH_POTION, 1, count = 3, consumable = True), item(LONG_SWORD, 2)), 120.0)
+    timeline.update(players(item(SERRATED_DIRK, 0), item(HEALTH_POTION, 1, count = 2, consumable = True)), 300.0)
+    timeline.update(players(item(SERRATED_DIRK, 0)), 420.0)
+
+    assert timeline.transactions('P0') == [
+        Transaction(60.0, 'purchase', LONG_SWORD, 0, 1),
+        Transaction(60.0, 'purchase', HEALTH_POTION, 1, 3),
+        Transaction(120.0, 'purchase', LONG_SWORD, 2, 1),
+        Transaction(300.0, 'purchase', SERRATED_DIRK, 0, 1),
+        Transaction(300.0, 'combine', LONG_SWORD, 0, 2),
+        Transaction(300.0, 'consume', HEALTH_POTION, 1, 1),
+        Transaction(420.0, 'consume', HEALTH_POTION, 1, 2),
+    ]
+    assert [transaction.item_ID for transaction in timeline.transactions('P0', kind = 'consume')] == [HEALTH_POTION] * 2
+    assert timeline.transactions('P0', since = 100.0, until = 300.0)[0].game_time == 120.0
+    assert timeline.first_purchase('P0', LONG_SWORD) == 60.0
+    assert timeline.first_purchase('P0', 3031) is None
+    assert timeline.inventory('P0')[0] == (SERRATED_DIRK, 1)
+    assert timeline.transactions('P5') == [Transaction(0.0, 'purchase', WARDING_TOTEM, 6, 1)]
+
+
+def test_selling_without_a_purchase():
+    timeline = InventoryTimeline()
+    timeline.update(players(item(LONG_SWORD, 0)), 60.0)
+    timeline.update(players(), 90.0)
+    assert timeline.transactions('P0', kind = 'sell') == [Transaction(90.0, 'sell', LONG_SWORD, 0, 1)]
+
+
+def test_unchanged_players_are_skipped():
+    timeline = InventoryTimeline()
+    snapshot = players(item(LONG_SWORD, 0))
+    assert timeline.update(snapshot, 60.0)
+    assert timeline.update(snapshot, 70.0) == []
+    assert timeline.update(players(item(LONG_SWORD, 0)), 80.0) == []
+    assert len(timeline.histories[timeline.slots['P0']].times) == 1
+
+
+def test_state_at_bisects_the_changes():
+    timeline = InventoryTimeline()
+    empty = ((0, 0),) * 7
+    timeline.update(players(item(LONG_SWORD, 0)), 60.0)
+    timeline.update(players(item(LONG_SWORD, 0), item(HEALTH_POTION, 1, count = 2, consumable = True)), 120.0)
+    timeline.update(players(item(SERRATED_DIRK, 0), item(HEALTH_POTION, 1, consumable = True)), 300.0)
+
+    assert timeline.state_at('P0', 59.9) == empty
+    assert timeline.state_at('P0', 60.0)[:2] == ((LONG_SWORD, 1), (0, 0))
+    assert timeline.state_at('P0', 119.0)[:2] == ((LONG_SWORD, 1), (0, 0))
+    assert timeline.state_at('P0', 120.0)[:2] == ((LONG_SWORD, 1), (HEALTH_POTION, 2))
+    assert timeline.state_at('P0', 299.0)[:2] == ((LONG_SWORD, 1), (HEALTH_POTION, 2))
+    assert timeline.state_at('P0', 1e9)[:2] == ((SERRATED_DIRK, 1), (HEALTH_POTION, 1))
+    assert timeline.state_at('P5', 60.0)[6] == (WARDING_TOTEM, 1)
@@ -0,0 +1,148 @@
+import http.client
+import json
+import os
+import sys
+import time
+from contextlib import closing
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import active
+import proxy
+from fixtures import ERROR_BODY, FakeLiveClient
+
+
+def event(event_ID, name = 'ChampionKill'):
+    return {'EventID' : event_ID, 'EventName' : name, 'EventTime' : 60.0 + event_ID, 'KillerName' : 'P0', 'VictimName' : 'P5'}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeLiveClient()
+    monkeypatch.setattr(active, '_live_session', lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def server(client):
+    """A proxy polling the fake client every 20 ms, in background threads."""
+    live = proxy.LiveClientProxy(port = 0, interval = 0.02)
+    live.start()
+    yield live
+    live.stop()
+
+
+def wait_for(condition, timeout = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def get(server, path, headers = None):
+    """Sends a request and reads the response headers, event streams are subscribed once they are sent."""
+    connection = http.client.HTTPConnection(*server.address, timeout = 5)
+    connection.request('GET', path, headers = headers or {})
+    response = connection.getresponse()
+    return connection, response
+
+
+def read_json(server, path):
+    connection, response = get(server, path)
+    with closing(connection):
+        return response.status, json.loads(response.read())
+
+
+def read_message(response):
+    """Reads one server-sent event, skipping keep-alive comments, as a list of its lines."""
+    lines = []
+    while True:
+        line = response.fp.readline().decode()
+        if line == '\n':
+            if lines:
+                return lines
+            continue
+        if not line.startswith(':'):
+            lines.append(line.rstrip('\n'))
+
+
+def test_routes_without_a_game(client):
+    client.state['playerlist'] = ERROR_BODY
+    server = proxy.LiveClientProxy(port = 0, interval = 0.02)
+    server.start()
+    assert read_json(server, '/liveclientdata/playerlist') == (503, {'error' : 'no active game'})
+    assert read_json(server, '/liveclientdata/unknown') == (404, {'error' : 'unknown endpoint'})
+    assert read_json(server, '/other/playerlist')[0] == 404
+    server.stop()
+
+
+def test_reads_are_served_from_the_cache(client, server):
+    wait_for(lambda: server.body('gamestats') is not None)
+    status, players = read_json(server, '/liveclientdata/playerlist')
+    assert status == 200 and players == client.state['playerlist']
+    assert read_json(server, '/liveclientdata/gamestats') == (200, client.state['gamestats'])
+    assert read_json(server, '/liveclientdata/allgamedata/')[1]['activePlayer'] == client.state['activeplayer']
+    #unchanged payloads keep their encoded body
+    body = server.body('playerlist')
+    polls = client.requests.count('playerlist')
+    wait_for(lambda: client.requests.count('playerlist') >= polls + 2)
+    assert server.body('playerlist') is body
+    #consumers never reach the game client
+    requests = len(client.requests)
+    for _ in range(20):
+        read_json(server, '/liveclientdata/eventdata')
+    assert len(client.requests) - requests < 20
+    #one gamestats request per poll
+    assert abs(client.requests.count('gamestats') - client.requests.count('playerlist')) <= 2
+
+
+def test_event_stream_framing_and_replay(client, server):
+    wait_for(lambda: server.body('eventdata') is not None)
+    connection, response = get(server, '/events')
+    with closing(connection):
+        assert response.status == 200
+        assert response.getheader('Content-Type') == 'text/event-stream'
+        client.state['eventdata'] = {'Events' : client.state['eventdata']['Events'] + [event(1), event(2)]}
+        first, second = read_message(response), read_message(response)
+        assert first == ['event: ChampionKill', 'id: 1', 'data: ' + json.dumps(event(1), separators = (',', ':'))]
+        assert second[:2] == ['event: ChampionKill', 'id: 2']
+
+    #a reconnecting consumer gets what it missed after its Last-Event-ID
+    client.state['eventdata'] = {'Events' : client.state['eventdata']['Events'] + [event(3, 'DragonKill')]}
+    wait_for(lambda: server._broadcast_id == 3)
+    connection, response = get(server, '/events', {'Last-Event-ID' : '1'})
+    with closing(connection):
+        assert [read_message(response)[1] for _ in range(2)] == ['id: 2', 'id: 3']
+
+    #the end of the game is streamed
+    connection, response = get(server, '/events')
+    with closing(connection):
+        client.state['playerlist'] = ERROR_BODY
+        assert read_message(response) == ['event: GameEnd', 'data: {}']
+
+
+def drain(events):
+    items = []
+    while not events.empty():
+        items.append(events.get_nowait())
+    return items
+
+
+def test_replay_stops_at_the_streamed_events(client):
+    live = proxy.LiveClientProxy(port = 0)
+    try:
+        game = live.game = active.ActiveGame()
+        live._publish(game.updateGameStats(), game.event_list)
+        #new events are applied to the store, but not streamed yet
+        client.state['eventdata'] = {'Events' : client.state['eventdata']['Events'] + [event(1), event(2)]}
+        new_events = game.updateEventList()
+        assert [item[1] for item in drain(live.subscribe(-1))] == [0]
+        events = live.subscribe(0)
+        assert drain(events) == []
+        live._publish(game.updateGameStats(), new_events)
+        assert [item[1] for item in drain(events)] == [1, 2]
+        assert [item[1] for item in drain(live.subscribe(0))] == [1, 2]
+    finally:
+        live._server.server_close()
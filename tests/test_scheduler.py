@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Client_interface
+from Client_interface import BACKGROUND, CRITICAL, INTERACTIVE, _Scheduler
+from fixtures import FakeSession, lcu_client
+
+
+SESSION = {
+    'localPlayerCellId' : 0,
+    'myTeam' : [{'summonerId' : 1, 'cellId' : 0}],
+    'actions' : [[{'id' : 4, 'actorCellId' : 0, 'isAllyAction' : True, 'isInProgress' : True, 'completed' : False, 'type' : 'pick'}]],
+}
+
+
+def admitted_in_order(scheduler, priorities):
+    """Queues one waiting acquire per priority, in order, and returns the priorities in admission order."""
+    admitted = []
+    threads = []
+    for priority in priorities:
+        thread = threading.Thread(target = lambda priority = priority: admitted.append(scheduler.acquire(priority) or priority))
+        thread.start()
+        threads.append(thread)
+        #lets the thread enqueue before the next one
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    return admitted
+
+
+def test_waiting_requests_are_admitted_by_priority_then_arrival():
+    scheduler = _Scheduler(rate = 20.0, burst = 1)
+    scheduler.acquire()
+    order = admitted_in_order(scheduler, [BACKGROUND, INTERACTIVE, BACKGROUND, INTERACTIVE])
+    assert order == [INTERACTIVE, INTERACTIVE, BACKGROUND, BACKGROUND]
+
+
+def test_tokens_refill_at_the_rate():
+    scheduler = _Scheduler(rate = 20.0, burst = 2)
+    start = time.monotonic()
+    scheduler.acquire()
+    scheduler.acquire()
+    assert time.monotonic() - start < 0.02
+    scheduler.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.03 <= elapsed < 0.5
+
+
+def test_critical_requests_bypass_the_bucket():
+    scheduler = _Scheduler(rate = 1.0, burst = 1)
+    scheduler.acquire()
+    start = time.monotonic()
+    scheduler.acquire(CRITICAL)
+    assert time.monotonic() - start < 0.1
+
+
+def test_interrupted_acquire_leaves_the_queue(monkeypatch):
+    scheduler = _Scheduler(rate = 20.0, burst = 1)
+    scheduler.acquire()
+
+    def interrupt(timeout = None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(scheduler._cond, 'wait', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.acquire()
+    monkeypatch.undo()
+
+    assert scheduler._waiting == []
+    later = threading.Thread(target = scheduler.acquire, args = (BACKGROUND,))
+    later.start()
+    later.join(1)
+    assert not later.is_alive()
+
+
+def test_critical_read_does_not_join_a_queued_read(monkeypatch):
+    session = FakeSession({'/lol-champ-select/v1/session' : SESSION})
+    #the connection check is critical and takes the only token
+    client = lcu_client(Client_interface.Client, monkeypatch, session, rate_limit = 1.0, burst = 1)
+    queued = threading.Thread(target = client.get_champ_select)
+    queued.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    assert client.select_champ(103)
+    elapsed = time.monotonic() - start
+    queued.join()
+
+    assert elapsed < 0.3
+    assert ('POST', '/lol-champ-select/v1/session/actions/4/complete') in session.requests
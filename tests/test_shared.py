@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared
+from active import ActivePlayer, GameSnapshot, Player
+from fixtures import activeplayer, item, player, playerlist
+from shared import SEQUENCE, SEQUENCE_OFFSET, SnapshotReader, SnapshotWriter, StoreError
+
+
+def snapshot(game_time, event_count, raw_players = None):
+    raw_players = raw_players or playerlist()
+    players = tuple(ActivePlayer(user, activeplayer()) if user['summonerName'] == 'P0' else Player(user) for user in raw_players)
+    events = tuple({'EventID' : index, 'EventName' : 'ChampionKill' if index else 'GameStart', 'EventTime' : float(index),
+                    'KillerName' : 'P%d' % (index % 10), 'VictimName' : 'P%d' % ((index + 5) % 10)} for index in range(event_count))
+    return GameSnapshot(players, players[0], events, game_time, raw_players, activeplayer())
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / 'game.snapshot')
+    writer = SnapshotWriter(path, player_capacity = 16, event_capacity = 8)
+    reader = SnapshotReader(path)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_round_trip(store):
+    writer, reader = store
+    assert reader.read() == (0, 0.0, (), (), -1)
+    raw = playerlist()
+    raw[3] = player('P3', 'ORDER', items = [item(1055, 0), item(2003, 1, count = 2, consumable = True)], creep_score = 17)
+    assert writer.publish(snapshot(95.5, 3, raw)) == 2
+    state = reader.read()
+    assert (state.sequence, state.game_time, state.last_event_id) == (2, 95.5, 2)
+    assert [record.summoner_name for record in state.players] == ['P%d' % index for index in range(10)]
+    record = state.players[3]
+    assert (record.team, record.champion_name, record.creep_score) == ('ORDER', 'Ahri', 17)
+    assert record.item_IDs[:3] == (1055, 2003, 0) and record.item_counts[:3] == (1, 2, 0)
+    assert record.summoner_spell_IDs == (4, 14) and record.rune_IDs == (8112, 8100, 8200)
+    assert state.players[0].gold == 500.0 and state.players[5].team == 'CHAOS'
+    assert [(event.event_id, event.event_name, event.killer_name, event.victim_name) for event in state.events] == [
+        (0, 'GameStart', 'P0', 'P5'), (1, 'ChampionKill', 'P1', 'P6'), (2, 'ChampionKill', 'P2', 'P7')]
+
+
+def test_ring_keeps_the_newest_events(store):
+    writer, reader = store
+    writer.publish(snapshot(10.0, 5))
+    writer.publish(snapshot(20.0, 13))
+    state = reader.read()
+    #13 events in a ring of 8, the first 5 were overwritten
+    assert [event.event_id for event in state.events] == list(range(5, 13))
+    assert state.last_event_id == 12
+    writer.publish(snapshot(30.0, 14))
+    assert [event.event_id for event in reader.read().events] == list(range(6, 14))
+
+
+def test_since_event_id(store):
+    writer, reader = store
+    writer.publish(snapshot(10.0, 6))
+    assert [event.event_id for event in reader.read(since_event_id = 3).events] == [4, 5]
+    assert reader.read(since_event_id = 5).events == ()
+    assert len(reader.read(since_event_id = 5).players) == 10
+
+
+def test_odd_sequence_is_retried(store, monkeypatch):
+    writer, reader = store
+    writer.publish(snapshot(10.0, 2))
+    #a publish that is still in progress
+    SEQUENCE.pack_into(writer._map, SEQUENCE_OFFSET, 3)
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            writer.publish(snapshot(20.0, 4))
+
+    monkeypatch.setattr(shared.time, 'sleep', sleep)
+    state = reader.read()
+    assert len(sleeps) == 3
+    assert (state.sequence, state.game_time, state.last_event_id) == (4, 20.0, 3)
+
+
+def test_a_publish_that_never_ends_raises(store):
+    writer, reader = store
+    SEQUENCE.pack_into(writer._map, SEQUENCE_OFFSET, 1)
+    with pytest.raises(StoreError):
+        reader.read(retries = 5)
+
+
+def test_wait_for_a_new_sequence(store):
+    writer, reader = store
+    assert not reader.wait(0, timeout = 0.02)
+    writer.publish(snapshot(10.0, 1))
+    assert reader.wait(0, timeout = 0.02)
+
+
+def test_files_that_are_not_stores(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(StoreError):
+        SnapshotReader(str(path))
+    empty = tmp_path / 'empty.bin'
+    empty.write_bytes(b'')
+    with pytest.raises(StoreError):
+        SnapshotReader(str(empty))
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Client_interface
+from fixtures import FakeSession, lcu_client
+
+CALLERS = 8
+
+
+def make_client(client_class, monkeypatch):
+    """Creates a client whose champ select reads are held until `session.release` is set."""
+    session = FakeSession({'/lol-champ-select/v1/session' : {'myTeam' : [], 'actions' : []}}, hold = True)
+    return lcu_client(client_class, monkeypatch, session, rate_limit = None), session
+
+
+def release_when_joined(client, session):
+    """Lets the held request finish once every other caller joined it."""
+    def wait():
+        deadline = time.monotonic() + 5
+        while client._transport.coalesced < CALLERS - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        session.release.set()
+    threading.Thread(target = wait).start()
+
+
+def champ_select_requests(session):
+    return [request for request in session.requests if request[1] == '/lol-champ-select/v1/session']
+
+
+def test_concurrent_threads_share_one_request(monkeypatch):
+    client, session = make_client(Client_interface.Client, monkeypatch)
+    results = []
+    threads = [threading.Thread(target = lambda: results.append(client.get_champ_select())) for _ in range(CALLERS)]
+    release_when_joined(client, session)
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(champ_select_requests(session)) == 1
+    assert len(results) == CALLERS
+    assert all(result is results[0] for result in results)
+
+
+def test_concurrent_coroutines_share_one_request(monkeypatch):
+    client, session = make_client(Client_interface.Async_Client, monkeypatch)
+
+    async def read_all():
+        release_when_joined(client, session)
+        return await asyncio.gather(*[client.get_champ_select() for _ in range(CALLERS)])
+
+    results = asyncio.run(read_all())
+
+    assert len(champ_select_requests(session)) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_sequential_reads_are_not_shared(monkeypatch):
+    client, session = make_client(Client_interface.Client, monkeypatch)
+    session.release.set()
+    client.get_champ_select()
+    client.get_champ_select()
+
+    assert len(champ_select_requests(session)) == 2
+
+
+def test_cancelled_leader_does_not_cancel_the_followers(monkeypatch):
+    client, session = make_client(Client_interface.Async_Client, monkeypatch)
+
+    async def read():
+        leader = asyncio.ensure_future(client.get_champ_select())
+        while not champ_select_requests(session):
+            await asyncio.sleep(0.001)
+        followers = [asyncio.ensure_future(client.get_champ_select()) for _ in range(CALLERS - 1)]
+        while client._transport.coalesced < CALLERS - 1:
+            await asyncio.sleep(0.001)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        session.release.set()
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        #the flight is over, the next read sends a new request
+        await client.get_champ_select()
+        return results
+
+    results = asyncio.run(read())
+
+    assert all(result == {'myTeam' : [], 'actions' : []} for result in results)
+    assert len(champ_select_requests(session)) == 2
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from active import ActivePlayer, Player
+from fixtures import activeplayer, item, player
+from stats import StatsEngine, credited_team
+
+
+def roster(order_items = (), chaos_items = (), gold = 500.0, kills = 0):
+    order = player('P0', 'ORDER', items = order_items)
+    order['scores']['kills'] = kills
+    return [ActivePlayer(order, activeplayer(gold = gold)), Player(player('P5', 'CHAOS', items = chaos_items))]
+
+
+def test_update_keeps_player_and_team_columns():
+    stats = StatsEngine()
+    assert stats.update(roster(order_items = [item(1055, 0, price = 450)], kills = 2), 60.0) == 2
+    assert stats.columns['kills'][stats.slots['P0']] == 2
+    assert stats.team_totals('ORDER')['item_value'] == 450
+    players = roster(order_items = [item(1055, 0, price = 450), item(1001, 1, price = 300)], kills = 3)
+    assert stats.update(players, 90.0) == 1
+    assert stats.team_totals('ORDER')['kills'] == 3
+    assert stats.team_totals('ORDER')['item_value'] == 750
+    #the same objects again are skipped
+    assert stats.update(players, 95.0) == 0
+    assert stats.kda('P0') == 3.0
+
+
+def test_gold_difference_compares_item_value_only():
+    stats = StatsEngine()
+    stats.update(roster(order_items = [item(1055, 0, price = 450)], chaos_items = [item(1036, 0, price = 350)], gold = 2000.0), 60.0)
+    #the unspent gold of the active player is not counted
+    assert stats.gold_difference() == 100
+    assert stats.team_totals('ORDER')['gold'] == 2000.0
+
+
+def test_gold_gained_is_timed_by_the_update():
+    stats = StatsEngine()
+    stats.update(roster(order_items = [item(1055, 0, price = 450)]), 60.0)
+    stats.update(roster(order_items = [item(1055, 0, price = 450), item(3044, 1, price = 1100)], gold = 100.0), 120.0)
+    stats.update(roster(order_items = [item(1055, 0, price = 450), item(3044, 1, price = 1100)], gold = 900.0), 150.0)
+    assert stats.gold_gained('P0', 60.0) == 1100
+    assert stats.gold_gained('P0', 20.0) == 0
+    assert stats.gold_gained('P0', 120.0) == 1550
+    assert stats.team_gold_gained('ORDER', 60.0) == 1100
+    assert stats.team_gold_gained('CHAOS', 60.0) == 0
+
+
+def test_objectives_are_credited_to_teams():
+    stats = StatsEngine()
+    stats.update(roster(), 60.0)
+    events = [{'EventName' : 'DragonKill', 'KillerName' : 'P5'},
+              {'EventName' : 'TurretKilled', 'TurretKilled' : 'Turret_T2_R_03_A', 'KillerName' : 'Minion_T1L1S01'},
+              {'EventName' : 'ChampionKill', 'KillerName' : 'P0'},
+              {'EventName' : 'BaronKill', 'KillerName' : 'SRU_Baron'}]
+    assert stats.add_events(events) == 2
+    assert stats.team_totals('CHAOS')['dragons'] == 1
+    assert stats.team_totals('ORDER')['turrets'] == 1
+    assert credited_team({'InhibKilled' : 'Barracks_T1_C1'}, {}) == 'CHAOS'
+
+
+def test_cs_per_minute():
+    stats = StatsEngine()
+    players = roster()
+    players[1] = Player(player('P5', 'CHAOS', creep_score = 30))
+    stats.update(players, 180.0)
+    assert stats.cs_per_minute('P5') == 10.0
+    assert stats.cs_per_minute('P0') == 0.0
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Client_interface
+import tracing
+from fixtures import FakeSession, lcu_client
+
+
+@pytest.fixture(autouse = True)
+def disabled():
+    tracing.disable()
+    yield
+    tracing.disable()
+
+
+def test_spans_do_nothing_while_disabled():
+    with tracing.span('idle') as span:
+        pass
+    assert span is tracing._NO_SPAN
+    assert tracing.current() is None
+
+
+def test_span_records_name_duration_and_thread():
+    tracer = tracing.enable()
+    with tracing.span('outer', 'test', endpoint = 'x'):
+        with tracing.span('inner'):
+            time.sleep(0.01)
+    inner, outer = tracer.spans
+    assert (inner[0], outer[0], outer[1], outer[5]) == ('inner', 'outer', 'test', {'endpoint' : 'x'})
+    assert outer[3] >= inner[3] >= 10 ** 7
+    assert outer[4] == inner[4] == threading.get_ident()
+    summary = tracer.summary()
+    assert summary['outer']['count'] == 1
+    assert list(summary) == ['outer', 'inner']
+    assert tracer.chrome_trace()['traceEvents'][0]['name'] == 'inner'
+
+
+def test_traced_functions_and_coroutines():
+    @tracing.traced()
+    def double(value):
+        return value * 2
+
+    @tracing.traced('named', 'async')
+    async def triple(value):
+        await asyncio.sleep(0)
+        return value * 3
+
+    assert double(2) == 4
+    tracer = tracing.enable()
+    assert double(3) == 6
+    assert asyncio.run(triple(3)) == 9
+    assert [(span[0], span[1]) for span in tracer.spans] == [('double', 'lol'), ('named', 'async')]
+    assert double.__name__ == 'double' and triple.__name__ == 'triple'
+
+
+def test_gathered_spans_get_a_track_per_task():
+    @tracing.traced()
+    async def fetch(delay):
+        with tracing.span('decode'):
+            await asyncio.sleep(delay)
+
+    async def main():
+        with tracing.span('refresh'):
+            await asyncio.gather(fetch(0.02), fetch(0.01), fetch(0.03))
+
+    tracer = tracing.enable()
+    asyncio.run(main())
+    tracks = {}
+    for name, category, start, duration, track, args in tracer.spans:
+        tracks.setdefault(track, []).append((name, start, start + duration))
+    #the refresh span on the main task, and one track per gathered fetch
+    assert len(tracks) == 4
+    assert threading.get_ident() not in tracks
+    for spans in tracks.values():
+        #spans of a track are either nested or disjoint, never partially overlapping
+        for name, start, end in spans:
+            for other, other_start, other_end in spans:
+                assert end <= other_start or other_end <= start or (start <= other_start and other_end <= end) or (other_start <= start and end <= other_end)
+
+
+def test_disable_stops_the_profiler():
+    tracer = tracing.enable(profile = True, interval = 0.001)
+    profiler = tracer.profiler
+    deadline = time.monotonic() + 2
+    while not profiler.samples and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert profiler.samples
+    assert tracing.disable() is tracer
+    assert profiler._thread is None
+    assert not any(thread.name == 'SamplingProfiler' for thread in threading.enumerate())
+    count = len(profiler.samples)
+    time.sleep(0.02)
+    assert len(profiler.samples) == count
+    assert tracing.current() is None
+    assert tracing.disable() is None
+
+
+ENDPOINT_METHODS = ['get_champ_select', 'get_game_phase', 'get_pickable_champions', 'get_rune_pages', 'get_current_page']
+
+
+def test_client_spans_are_named_after_the_endpoint_method(monkeypatch):
+    session = FakeSession({'/lol-champ-select/v1/session' : {'actions' : []}, '/lol-gameflow/v1/gameflow-phase' : 'ChampSelect',
+                           '/lol-champ-select/v1/pickable-champion-ids' : [1], '/lol-perks/v1/pages' : [],
+                           '/lol-perks/v1/currentpage' : {'id' : 1}})
+    client = lcu_client(Client_interface.Client, monkeypatch, session, rate_limit = None)
+    tracer = tracing.enable()
+    for name in ENDPOINT_METHODS:
+        getattr(client, name)()
+    names = [span[0] for span in tracer.spans if span[1] == 'lcu' and span[0] != 'lcu_request']
+    assert names == ENDPOINT_METHODS
+    assert [span[0] for span in tracer.spans].count('lcu_request') == len(ENDPOINT_METHODS)
+
+
+def test_async_client_spans_are_named_after_the_endpoint_method(monkeypatch):
+    client = lcu_client(Client_interface.Async_Client, monkeypatch, FakeSession(), rate_limit = None)
+    tracer = tracing.enable()
+
+    async def read():
+        await client.get_champ_select()
+        await client.get_game_phase()
+
+    asyncio.run(read())
+    assert [span[0] for span in tracer.spans if span[0] != 'lcu_request'] == ['get_champ_select', 'get_game_phase']
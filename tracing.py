@@ -0,0 +1,288 @@
+"""
+Handles opt-in tracing of where the time of a poll tick or a client call goes.
+
+`ActiveGame` updates and `Client` endpoints are instrumented with spans. Spans cost a
+single check while tracing is disabled, which is the default. Once `enable()` is
+called, every span is recorded with its duration and track, and the recording can be
+summarized or exported as a Chrome trace (chrome://tracing, https://ui.perfetto.dev).
+
+The track of a span is the asyncio task it was entered in, or its thread outside of a
+task. Coroutines gathered on one event loop share a thread but run as separate tasks,
+so their spans land on separate tracks instead of overlapping on the loop's thread.
+
+Classes:
+    `Tracer` - records spans
+    `SamplingProfiler` - samples the stacks of every thread at a fixed interval
+
+Methods:
+    `enable(capacity, profile, interval)` -> Tracer
+    `disable()` -> Tracer
+    `current()` -> Tracer
+    `span(name, category, **args)` -> context manager
+    `traced(name, category)` -> decorator
+
+Spans of ActiveGame:
+    `loadPlayerList`, `updateEventList`, `updateGameStats` - a whole update
+    `fetch` - the HTTP request of one endpoint
+    `decode` - fingerprinting and json decoding of one body
+    `build_players` - `Player`, `ActivePlayer` and `Item` construction
+    `stats` - applying a snapshot or new events to the `StatsEngine`
+    `inventory` - diffing the items of a snapshot into the `InventoryTimeline`
+    `apply_events` - the EventID diff and event indexing
+
+Spans of Client:
+    one span per endpoint method, named after it, and one `lcu_request` span per request
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+_tracer = None
+
+#code flag of `async def` functions, checked directly because importing inspect is slow
+_CO_COROUTINE = 0x80
+
+
+class _NoSpan:
+    """The span returned while tracing is disabled, it does nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _track():
+    """Gets the id of the running asyncio task, or the thread id outside of a task."""
+    #asyncio is only asked when something already imported it, importing it here is slow
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            #no event loop is running in this thread
+            task = None
+        if task is not None:
+            return id(task)
+    return threading.get_ident()
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.track = _track()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer.spans.append((self.name, self.category, self.start, end - self.start, self.track, self.args))
+        return False
+
+
+class Tracer:
+    """
+    A class that records spans.
+
+    Attributes:
+    ----------
+    `spans` : deque
+        the newest `capacity` spans, as (name, category, start ns, duration ns, track, args),
+        the track being the id of the asyncio task the span ran in, or its thread id
+    `profiler` : SamplingProfiler
+        the profiler started with the tracer, or None
+
+    Methods:
+    ----------
+    `summary()` : dict
+        count, total, mean and max milliseconds per span name
+    `chrome_trace()` : dict
+        the spans in the Chrome trace event format
+    `export_chrome(path)` : None
+        writes `chrome_trace()` to a json file
+    `clear()` : None
+        forgets every recorded span
+    """
+    def __init__(self, capacity : int = 100000):
+        self.spans = deque(maxlen = capacity)
+        self.profiler = None
+
+    def span(self, name : str, category : str = 'lol', **args):
+        return _Span(self, name, category, args)
+
+    def clear(self):
+        self.spans.clear()
+
+    def summary(self):
+        """Gets the count, total, mean and max duration in milliseconds of every span name."""
+        totals = {}
+        for name, category, start, duration, track, args in list(self.spans):
+            entry = totals.get(name)
+            if entry is None:
+                entry = totals[name] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        return {name : {'count' : count, 'total_ms' : total / 1e6, 'mean_ms' : total / count / 1e6, 'max_ms' : longest / 1e6}
+                for name, (count, total, longest) in sorted(totals.items(), key = lambda item: -item[1][1])}
+
+    def chrome_trace(self):
+        """Gets the spans, and the profiler samples if any, in the Chrome trace event format."""
+        pid = os.getpid()
+        events = [{'name' : name, 'cat' : category, 'ph' : 'X', 'ts' : start / 1000, 'dur' : duration / 1000,
+                   'pid' : pid, 'tid' : track, 'args' : args}
+                  for name, category, start, duration, track, args in list(self.spans)]
+        if self.profiler is not None:
+            events.extend(self.profiler.chrome_events(pid))
+        return {'traceEvents' : events, 'displayTimeUnit' : 'ms'}
+
+    def export_chrome(self, path : str):
+        """Writes the trace to a json file that chrome://tracing and Perfetto can open."""
+        import json
+        with open(path, 'w', encoding = 'utf-8') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+class SamplingProfiler:
+    """
+    A class that samples the Python stacks of every thread from a background thread.
+
+    Attributes:
+    ----------
+    `interval` : float
+        seconds between samples
+    `samples` : deque
+        (ns timestamp, thread id, stack) of every sample, stacks are tuples of
+        "function (file:line)" strings, outermost first
+
+    Methods:
+    ----------
+    `start()` : None
+        starts sampling
+    `stop()` : None
+        stops sampling and waits for the sampling thread to exit
+    `folded()` : str
+        samples per stack in the folded format of flamegraph tools
+    `chrome_events(pid)` : list[dict]
+        samples as Chrome trace instant events
+    """
+    def __init__(self, interval : float = 0.005, capacity : int = 100000):
+        self.interval = interval
+        self.samples = deque(maxlen = capacity)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target = self._run, name = 'SamplingProfiler', daemon = True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            now = time.perf_counter_ns()
+            for thread, frame in sys._current_frames().items():
+                if thread == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append('%s (%s:%d)' % (code.co_name, os.path.basename(code.co_filename), frame.f_lineno))
+                    frame = frame.f_back
+                self.samples.append((now, thread, tuple(reversed(stack))))
+
+    def folded(self):
+        """Gets one "frame;frame;frame count" line per distinct stack, as flamegraph tools read them."""
+        counts = {}
+        for now, thread, stack in list(self.samples):
+            key = ';'.join(stack)
+            counts[key] = counts.get(key, 0) + 1
+        return '\n'.join('%s %d' % (stack, count) for stack, count in sorted(counts.items(), key = lambda item: -item[1]))
+
+    def chrome_events(self, pid : int):
+        """Gets the samples as Chrome trace instant events, named after their innermost frame."""
+        return [{'name' : stack[-1] if stack else '?', 'cat' : 'sample', 'ph' : 'i', 's' : 't', 'ts' : now / 1000,
+                 'pid' : pid, 'tid' : thread, 'args' : {'stack' : list(stack)}}
+                for now, thread, stack in list(self.samples)]
+
+
+def enable(capacity : int = 100000, profile : bool = False, interval : float = 0.005):
+    """
+    Starts recording spans, returns the `Tracer`.
+
+    Parameters:
+    -----------
+    `capacity` : int
+        number of spans kept, the oldest are dropped first
+    `profile` : bool
+        also start a `SamplingProfiler`, it is stopped by `disable()`
+    `interval` : float
+        seconds between profiler samples
+    """
+    global _tracer
+    disable()
+    tracer = Tracer(capacity)
+    if profile:
+        tracer.profiler = SamplingProfiler(interval)
+        tracer.profiler.start()
+    _tracer = tracer
+    return tracer
+
+
+def disable():
+    """Stops recording spans and stops the profiler, returns the tracer that was recording, or None."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and tracer.profiler is not None:
+        tracer.profiler.stop()
+    return tracer
+
+
+def current():
+    """Gets the recording `Tracer`, or None while tracing is disabled."""
+    return _tracer
+
+
+def span(name : str, category : str = 'lol', **args):
+    """Returns a context manager that records a span while tracing is enabled, and does nothing otherwise."""
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(name : str = None, category : str = 'lol'):
+    """Decorates a function, or a coroutine function, so every call is recorded as a span."""
+    def decorate(function):
+        span_name = name or function.__name__
+        if getattr(function, '__code__', None) is not None and function.__code__.co_flags & _CO_COROUTINE:
+            async def wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    return await function(*args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    return function(*args, **kwargs)
+        return functools.wraps(function)(wrapper)
+    return decorate